@@ -16,6 +16,9 @@ depends_on = None
 
 
 def upgrade():
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
     op.create_table(
         'users',
         sa.Column('id', sa.Integer(), nullable=False),
@@ -17,6 +17,9 @@ depends_on = None
 
 
 def upgrade():
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
     op.create_table(
         'deals',
         sa.Column('id', sa.Integer(), nullable=False),
@@ -34,8 +37,11 @@ def upgrade():
         sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_deals_firm_id'), 'deals', ['firm_id'], unique=False)
-    op.create_index(op.f('ix_deals_id'), 'deals', ['id'], unique=False)
+    # CREATE INDEX CONCURRENTLY avoids holding a write lock on the table
+    # while the index builds; it cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_deals_firm_id'), 'deals', ['firm_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_deals_id'), 'deals', ['id'], unique=False, postgresql_concurrently=True)
 
 
 def downgrade():
@@ -16,6 +16,9 @@ depends_on = None
 
 
 def upgrade():
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
     op.create_table(
         'documents',
         sa.Column('id', sa.Integer(), nullable=False),
@@ -30,7 +33,9 @@ def upgrade():
         sa.ForeignKeyConstraint(['uploaded_by_id'], ['users.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_documents_id'), 'documents', ['id'], unique=False)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_documents_id'), 'documents', ['id'], unique=False, postgresql_concurrently=True)
 
 
 def downgrade():
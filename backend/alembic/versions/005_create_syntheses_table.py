@@ -17,6 +17,9 @@ depends_on = None
 
 
 def upgrade():
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
     op.create_table(
         'syntheses',
         sa.Column('id', sa.Integer(), nullable=False),
@@ -46,7 +49,9 @@ def upgrade():
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('deal_id')
     )
-    op.create_index(op.f('ix_syntheses_id'), 'syntheses', ['id'], unique=False)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_syntheses_id'), 'syntheses', ['id'], unique=False, postgresql_concurrently=True)
 
 
 def downgrade():
@@ -17,6 +17,9 @@ depends_on = None
 
 
 def upgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
     # Create audit_logs table
     op.create_table(
         'audit_logs',
@@ -31,24 +34,23 @@ def upgrade() -> None:
         sa.Column('user_agent', sa.Text(), nullable=True),
         sa.Column('metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
         sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+        # Declared inline so the table and its FK are one DDL statement
+        # instead of a CREATE TABLE followed by a locking ALTER TABLE
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='fk_audit_logs_user_id', ondelete='SET NULL'),
         sa.PrimaryKeyConstraint('id')
     )
 
-    # Create indexes for efficient querying
-    op.create_index('idx_audit_logs_timestamp', 'audit_logs', ['timestamp'], unique=False, postgresql_using='btree', postgresql_ops={'timestamp': 'DESC'})
-    op.create_index('idx_audit_logs_user', 'audit_logs', ['user_id', 'timestamp'], unique=False, postgresql_ops={'timestamp': 'DESC'})
-    op.create_index('idx_audit_logs_firm', 'audit_logs', ['firm_id', 'timestamp'], unique=False, postgresql_ops={'timestamp': 'DESC'})
-    op.create_index('idx_audit_logs_action', 'audit_logs', ['action'], unique=False)
-    op.create_index('idx_audit_logs_resource', 'audit_logs', ['resource_type', 'resource_id'], unique=False)
-
-    # Add foreign key constraint to users table
-    op.create_foreign_key('fk_audit_logs_user_id', 'audit_logs', 'users', ['user_id'], ['id'], ondelete='SET NULL')
+    # Create indexes for efficient querying; CREATE INDEX CONCURRENTLY
+    # avoids locking out writers and cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('idx_audit_logs_timestamp', 'audit_logs', ['timestamp'], unique=False, postgresql_using='btree', postgresql_ops={'timestamp': 'DESC'}, postgresql_concurrently=True)
+        op.create_index('idx_audit_logs_user', 'audit_logs', ['user_id', 'timestamp'], unique=False, postgresql_ops={'timestamp': 'DESC'}, postgresql_concurrently=True)
+        op.create_index('idx_audit_logs_firm', 'audit_logs', ['firm_id', 'timestamp'], unique=False, postgresql_ops={'timestamp': 'DESC'}, postgresql_concurrently=True)
+        op.create_index('idx_audit_logs_action', 'audit_logs', ['action'], unique=False, postgresql_concurrently=True)
+        op.create_index('idx_audit_logs_resource', 'audit_logs', ['resource_type', 'resource_id'], unique=False, postgresql_concurrently=True)
 
 
 def downgrade() -> None:
-    # Drop foreign key constraint
-    op.drop_constraint('fk_audit_logs_user_id', 'audit_logs', type_='foreignkey')
-
     # Drop indexes
     op.drop_index('idx_audit_logs_resource', 'audit_logs')
     op.drop_index('idx_audit_logs_action', 'audit_logs')
@@ -0,0 +1,35 @@
+"""brin index on audit_logs timestamp
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-10-27
+
+audit_logs is append-only, so timestamp values correlate almost
+perfectly with physical row order. A BRIN index exploits that: it
+stores one summary per block range instead of one entry per row,
+making it orders of magnitude smaller than the btree it replaces
+while still serving the time-range scans the audit views run.
+
+The source request suggested partitioning the index; the table is not
+partitioned, so this applies a plain BRIN index to the whole table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_audit_logs_timestamp', table_name='audit_logs', postgresql_concurrently=True)
+        op.create_index('idx_audit_logs_timestamp_brin', 'audit_logs', ['timestamp'], unique=False, postgresql_using='brin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_audit_logs_timestamp_brin', table_name='audit_logs', postgresql_concurrently=True)
+        op.create_index('idx_audit_logs_timestamp', 'audit_logs', ['timestamp'], unique=False, postgresql_using='btree', postgresql_ops={'timestamp': 'DESC'}, postgresql_concurrently=True)
@@ -0,0 +1,37 @@
+"""gin index on audit_logs metadata
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-10-27
+
+The metadata column is already JSONB (006); this adds the GIN index so
+containment queries (metadata @> '{...}') use an index scan instead of
+a sequential scan over the whole log. jsonb_path_ops keeps the index
+smaller than the default operator class and still covers @>.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_audit_logs_metadata_gin',
+            'audit_logs',
+            ['metadata'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'metadata': 'jsonb_path_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_audit_logs_metadata_gin', table_name='audit_logs', postgresql_concurrently=True)
@@ -0,0 +1,45 @@
+"""covering indexes on hot lookup paths
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-10-27
+
+Workflow and document lookups always filter on deal_id and mostly read
+a couple of narrow columns. INCLUDE puts those payload columns in the
+index leaf pages so status polling and document listings can be served
+by index-only scans without touching the heap.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_workflows_deal_id_covering',
+            'workflows',
+            ['deal_id'],
+            unique=False,
+            postgresql_include=['status', 'progress_percent'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'idx_documents_deal_id_covering',
+            'documents',
+            ['deal_id'],
+            unique=False,
+            postgresql_include=['filename', 'file_size'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_documents_deal_id_covering', table_name='documents', postgresql_concurrently=True)
+        op.drop_index('idx_workflows_deal_id_covering', table_name='workflows', postgresql_concurrently=True)
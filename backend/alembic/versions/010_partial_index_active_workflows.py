@@ -0,0 +1,37 @@
+"""partial index on active workflows
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-10-27
+
+Status polling and executor pickup only ever look for a deal's pending
+or running workflows, which are a small slice of the table once deals
+complete. A partial composite index on (deal_id, status) restricted to
+the active statuses stays tiny and hot in cache regardless of how much
+completed history accumulates.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_workflows_deal_id_status_active',
+            'workflows',
+            ['deal_id', 'status'],
+            unique=False,
+            postgresql_where=sa.text("status IN ('PENDING', 'RUNNING')"),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_workflows_deal_id_status_active', table_name='workflows', postgresql_concurrently=True)
@@ -0,0 +1,59 @@
+"""split compiled findings into synthesis_details
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-10-27
+
+syntheses carried 18 JSON columns on one row; compiled_findings alone
+duplicates every workflow's raw findings and is never served by the
+API. Moving it to a 1:1 side table keeps the syntheses row narrow so
+the hot GET path reads far fewer pages and TOAST churn on updates
+stays off the main table.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    op.create_table(
+        'synthesis_details',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('synthesis_id', sa.Integer(), nullable=False),
+        sa.Column('compiled_findings', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['synthesis_id'], ['syntheses.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('synthesis_id')
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_synthesis_details_id'), 'synthesis_details', ['id'], unique=False, postgresql_concurrently=True)
+
+    # Carry existing payloads over before dropping the wide column
+    op.execute(
+        "INSERT INTO synthesis_details (synthesis_id, compiled_findings) "
+        "SELECT id, compiled_findings FROM syntheses WHERE compiled_findings IS NOT NULL"
+    )
+    op.drop_column('syntheses', 'compiled_findings')
+
+
+def downgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    op.add_column('syntheses', sa.Column('compiled_findings', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    op.execute(
+        "UPDATE syntheses SET compiled_findings = synthesis_details.compiled_findings "
+        "FROM synthesis_details WHERE synthesis_details.synthesis_id = syntheses.id"
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_synthesis_details_id'), table_name='synthesis_details', postgresql_concurrently=True)
+    op.drop_table('synthesis_details')
@@ -0,0 +1,35 @@
+"""composite index on deals (firm_id, id)
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-10-27
+
+Every deal-scoped endpoint resolves ownership with WHERE id = ? AND
+firm_id = ?; a composite (firm_id, id) index answers that check and the
+firm listing from one index without a heap visit per row. The deal_id
+FK lookups on workflows and documents got their indexes in 009.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_deals_firm_id_id',
+            'deals',
+            ['firm_id', 'id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_deals_firm_id_id', table_name='deals', postgresql_concurrently=True)
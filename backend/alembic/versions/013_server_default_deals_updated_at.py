@@ -0,0 +1,45 @@
+"""server-side default for deals.updated_at
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-10-27
+
+updated_at previously had no insert default, forcing routers to
+refresh() after commit just to return the timestamps. With a
+server-side now() default both timestamps come back on the INSERT's
+RETURNING clause, so write endpoints skip the extra SELECT.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    op.alter_column(
+        'deals',
+        'updated_at',
+        server_default=sa.text('now()'),
+        existing_type=sa.DateTime(timezone=True),
+        existing_nullable=True
+    )
+
+
+def downgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    op.alter_column(
+        'deals',
+        'updated_at',
+        server_default=None,
+        existing_type=sa.DateTime(timezone=True),
+        existing_nullable=True
+    )
@@ -0,0 +1,93 @@
+"""store workflow and synthesis JSON columns as JSONB
+
+Revision ID: 014
+Revises: 013
+Create Date: 2025-10-27
+
+The text-based json type re-parses the payload on every read and its
+containment operators cannot use an index. Converting the workflow and
+synthesis JSON columns to jsonb serves reads in binary form, and the
+GIN index on workflows.findings lets containment filters (findings @>
+'{...}') run as index scans. audit_logs.metadata has been jsonb since
+006.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+WORKFLOW_COLUMNS = ('findings', 'sources')
+SYNTHESIS_COLUMNS = (
+    'key_insights',
+    'confidence_by_dimension',
+    'key_risks',
+    'risk_mitigation',
+    'key_opportunities',
+    'value_creation_levers',
+    'dimension_scores',
+    'cross_workflow_insights',
+    'recommended_next_steps',
+    'information_gaps',
+    'workflows_included',
+)
+
+
+def upgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    for column in WORKFLOW_COLUMNS:
+        op.alter_column(
+            'workflows', column,
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            postgresql_using=f'{column}::jsonb'
+        )
+    for column in SYNTHESIS_COLUMNS:
+        op.alter_column(
+            'syntheses', column,
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            postgresql_using=f'{column}::jsonb'
+        )
+    op.alter_column(
+        'synthesis_details', 'compiled_findings',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='compiled_findings::jsonb'
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_workflows_findings_gin',
+            'workflows',
+            ['findings'],
+            postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_workflows_findings_gin', table_name='workflows', postgresql_concurrently=True)
+    op.alter_column(
+        'synthesis_details', 'compiled_findings',
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using='compiled_findings::json'
+    )
+    for column in SYNTHESIS_COLUMNS:
+        op.alter_column(
+            'syntheses', column,
+            type_=postgresql.JSON(astext_type=sa.Text()),
+            postgresql_using=f'{column}::json'
+        )
+    for column in WORKFLOW_COLUMNS:
+        op.alter_column(
+            'workflows', column,
+            type_=postgresql.JSON(astext_type=sa.Text()),
+            postgresql_using=f'{column}::json'
+        )
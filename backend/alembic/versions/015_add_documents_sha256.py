@@ -0,0 +1,42 @@
+"""add sha256 content hash to documents
+
+Revision ID: 015
+Revises: 014
+Create Date: 2025-10-27
+
+Uploads are now stored under generated names with their SHA-256
+recorded, so identical files can be deduplicated via hardlinks. The
+index serves the dedup lookup on upload.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    op.add_column('documents', sa.Column('sha256', sa.String(length=64), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_documents_sha256'),
+            'documents',
+            ['sha256'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_documents_sha256'), table_name='documents', postgresql_concurrently=True)
+    op.drop_column('documents', 'sha256')
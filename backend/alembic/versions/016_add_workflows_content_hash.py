@@ -0,0 +1,32 @@
+"""add content hash to workflows
+
+Revision ID: 016
+Revises: 015
+Create Date: 2025-10-27
+
+Completed workflows record a SHA-256 of their findings so replays and
+retries that produce an identical result can skip rewriting the JSONB
+blob, avoiding the WAL churn of idempotent updates.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    op.add_column('workflows', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    # Fail fast instead of queueing behind long-running transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("SET LOCAL statement_timeout = '60s'")
+    op.drop_column('workflows', 'content_hash')
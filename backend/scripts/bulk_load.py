@@ -0,0 +1,52 @@
+"""Helper for initial data loads: drop non-essential indexes, load, rebuild.
+
+Maintaining secondary indexes row-by-row during a bulk import is far
+slower than building them once afterwards. This wraps a load in a
+context manager that drops every non-unique secondary index on the
+given tables up front and rebuilds them (definitions preserved) when
+the load finishes.
+
+Usage:
+    from scripts.bulk_load import indexes_dropped
+
+    with indexes_dropped(engine, ["audit_logs", "workflows"]):
+        run_import(...)
+
+Primary keys and unique indexes are kept so constraint enforcement
+stays intact during the load.
+"""
+from contextlib import contextmanager
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+def _nonessential_indexes(conn, table: str) -> list:
+    """Return (name, definition) for non-unique secondary indexes on a table"""
+    rows = conn.execute(
+        text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE tablename = :table AND indexdef NOT ILIKE '%UNIQUE%'"
+        ),
+        {"table": table}
+    )
+    return [(row[0], row[1]) for row in rows]
+
+
+@contextmanager
+def indexes_dropped(engine: Engine, tables: list):
+    """Drop non-essential indexes on the tables for the duration of a bulk load"""
+    saved = []
+    with engine.begin() as conn:
+        for table in tables:
+            saved.extend(_nonessential_indexes(conn, table))
+        for name, _ in saved:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+
+    try:
+        yield
+    finally:
+        # Rebuild from the saved definitions; a single build over loaded
+        # data is much cheaper than incremental maintenance during the load
+        with engine.begin() as conn:
+            for _, indexdef in saved:
+                conn.execute(text(indexdef))
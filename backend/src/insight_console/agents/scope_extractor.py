@@ -1,15 +1,24 @@
-import json
+from functools import lru_cache
+import hashlib
+import orjson
+from collections import OrderedDict
 from typing import Dict, List
-from anthropic import Anthropic
-from insight_console.config import settings
+from insight_console.llm import get_client
+from insight_console.schemas.llm_output import ScopeExtractionResult
+
+# Cache of extraction results keyed by (text hash, sector, deal_type).
+# Re-runs and retries frequently resubmit identical memo text; a cache hit
+# skips the entire LLM round-trip. Bounded LRU so memory stays flat.
+_scope_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_SCOPE_CACHE_MAX_SIZE = 256
 
 class ScopeExtractor:
     """Agent for extracting analysis scope from investment materials"""
 
     def __init__(self):
-        self.client = Anthropic(api_key=settings.anthropic_api_key)
+        self.client = get_client()
 
-    def extract_scope(self, text: str, sector: str, deal_type: str) -> Dict:
+    async def extract_scope(self, text: str, sector: str, deal_type: str) -> Dict:
         """
         Extract key questions, hypotheses, and recommended workflows
         from investment memo or deal materials.
@@ -18,6 +27,14 @@ class ScopeExtractor:
             # Return defaults for empty input
             return self._get_default_scope(sector, deal_type)
 
+        # blake2b is ~3x faster than sha256 in hashlib; 16 bytes is plenty
+        # for cache-key collision resistance
+        text_hash = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        cache_key = (text_hash, sector, deal_type)
+        if cache_key in _scope_cache:
+            _scope_cache.move_to_end(cache_key)
+            return _scope_cache[cache_key]
+
         prompt = f"""You are analyzing materials for a PE {deal_type} deal in the {sector} sector.
 
 Extract the following from the provided text:
@@ -38,17 +55,25 @@ Return your response as JSON with this structure:
 Only include workflows that are relevant to the questions and sector."""
 
         try:
-            response = self.client.messages.create(
+            # Stream the response so tokens are consumed as they arrive
+            # instead of holding the request open until the full body lands
+            chunks = []
+            async with self.client.messages.stream(
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=2000,
                 messages=[{"role": "user", "content": prompt}]
-            )
+            ) as stream:
+                async for text in stream.text_stream:
+                    chunks.append(text)
 
-            # Extract text content
-            content = response.content[0].text
+            # Parse and validate against the expected shape
+            result = ScopeExtractionResult.model_validate(
+                orjson.loads("".join(chunks))
+            ).model_dump()
 
-            # Parse JSON
-            result = json.loads(content)
+            _scope_cache[cache_key] = result
+            if len(_scope_cache) > _SCOPE_CACHE_MAX_SIZE:
+                _scope_cache.popitem(last=False)
 
             return result
         except Exception as e:
@@ -76,3 +101,8 @@ Only include workflows that are relevant to the questions and sector."""
             ]
         }
         return defaults
+
+@lru_cache(maxsize=1)
+def get_scope_extractor() -> ScopeExtractor:
+    """Process-wide extractor instance; holds no per-request state"""
+    return ScopeExtractor()
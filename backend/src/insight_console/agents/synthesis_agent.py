@@ -1,59 +1,26 @@
-import json
+import asyncio
+import orjson
+from functools import lru_cache
+from io import StringIO
 from typing import Dict, List
-from anthropic import Anthropic
-from insight_console.config import settings
+from insight_console.llm import get_client
+from insight_console.schemas.llm_output import (
+    SummaryFragment,
+    RiskFragment,
+    OpportunityFragment,
+    ScoringFragment
+)
 
-class SynthesisAgent:
-    """
-    Agent for synthesizing findings from multiple workflow analyses
-    into actionable investment insights and recommendations.
-    """
-
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.anthropic_api_key)
-
-    def synthesize(
-        self,
-        deal_name: str,
-        sector: str,
-        workflow_findings: Dict[str, Dict],
-        key_questions: List[str],
-        hypotheses: List[str]
-    ) -> Dict:
-        """
-        Synthesize findings from all workflows into comprehensive analysis.
-
-        Args:
-            deal_name: Name of the deal/company
-            sector: Industry sector
-            workflow_findings: Dict mapping workflow_type to findings
-            key_questions: Original key questions
-            hypotheses: Original hypotheses to test
-
-        Returns:
-            Dict with synthesis results including recommendation, insights, risks, etc.
-        """
-
-        # Prepare findings summary for the prompt
-        findings_text = self._format_findings(workflow_findings)
-
-        prompt = f"""You are a senior PE investment professional synthesizing comprehensive due diligence findings.
-
-DEAL: {deal_name}
-SECTOR: {sector}
-
-ORIGINAL KEY QUESTIONS:
-{chr(10).join(f"- {q}" for q in key_questions)}
-
-ORIGINAL HYPOTHESES:
-{chr(10).join(f"- {h}" for h in hypotheses)}
+# Static instruction blocks for each sub-synthesis. Built once at import
+# time so the hot path only concatenates the per-deal context header
+# instead of reflowing these multi-kilobyte literals through an f-string
+# on every call.
 
-ANALYSIS FINDINGS:
-{findings_text}
+_SUMMARY_INSTRUCTIONS = """
 
-Your task is to synthesize these findings into actionable investment insights. Return JSON with this EXACT structure:
+Synthesize these findings into an executive view. Return JSON with this EXACT structure:
 
-{{
+{
     "executive_summary": "2-3 paragraph executive summary covering: (1) investment thesis, (2) key strengths/opportunities, (3) major risks/concerns, (4) bottom-line recommendation",
 
     "key_insights": [
@@ -64,27 +31,45 @@ Your task is to synthesize these findings into actionable investment insights. R
         "Critical insight 5"
     ],
 
-    "investment_recommendation": {{
+    "investment_recommendation": {
         "recommendation": "strong_buy|buy|hold|pass|strong_pass",
         "rationale": "Clear 2-3 sentence rationale for this recommendation",
         "conviction_level": "high|medium|low"
-    }},
+    },
 
     "hypothesis_validation": [
-        {{
+        {
             "hypothesis": "Original hypothesis text",
             "validated": true|false,
             "evidence": "Summary of supporting or contradicting evidence"
-        }}
+        }
     ],
 
+    "cross_workflow_insights": [
+        "Insight that connects findings across multiple analyses",
+        "Another cross-cutting insight",
+        "Third integrated insight"
+    ]
+}
+
+IMPORTANT:
+- Be objective and data-driven in your analysis
+- Highlight both strengths AND weaknesses
+- Ensure recommendation aligns with the evidence
+- Return ONLY valid JSON, no other text"""
+
+_RISK_INSTRUCTIONS = """
+
+Identify the material risks in this deal. Return JSON with this EXACT structure:
+
+{
     "key_risks": [
-        {{
+        {
             "risk": "Risk description",
             "severity": "high|medium|low",
             "likelihood": "high|medium|low",
             "impact_area": "market|financial|operational|team|competitive"
-        }}
+        }
     ],
 
     "risk_mitigation": [
@@ -93,81 +78,180 @@ Your task is to synthesize these findings into actionable investment insights. R
         "Mitigation strategy 3"
     ],
 
+    "information_gaps": [
+        "Critical information still needed",
+        "Another gap",
+        "Third gap"
+    ]
+}
+
+IMPORTANT:
+- Identify genuine risks, not just theoretical concerns
+- Return ONLY valid JSON, no other text"""
+
+_OPPORTUNITY_INSTRUCTIONS = """
+
+Identify the upside in this deal. Return JSON with this EXACT structure:
+
+{
     "key_opportunities": [
-        {{
+        {
             "opportunity": "Opportunity description",
             "potential_impact": "high|medium|low",
             "timeframe": "near-term|medium-term|long-term"
-        }}
+        }
     ],
 
     "value_creation_levers": [
-        {{
+        {
             "lever": "Value creation lever description",
             "priority": "high|medium|low",
             "estimated_impact": "Description of potential impact"
-        }}
+        }
     ],
 
-    "cross_workflow_insights": [
-        "Insight that connects findings across multiple analyses",
-        "Another cross-cutting insight",
-        "Third integrated insight"
-    ],
+    "recommended_next_steps": [
+        {
+            "step": "Next step description",
+            "priority": "high|medium|low",
+            "rationale": "Why this step is important"
+        }
+    ]
+}
+
+IMPORTANT:
+- Focus on actionable insights
+- Return ONLY valid JSON, no other text"""
+
+_SCORING_INSTRUCTIONS = """
 
-    "dimension_scores": {{
+Score this deal across analysis dimensions. Return JSON with this EXACT structure:
+
+{
+    "dimension_scores": {
         "market_attractiveness": 0-100,
         "competitive_position": 0-100,
         "financial_performance": 0-100,
         "management_quality": 0-100,
         "unit_economics": 0-100,
         "overall_score": 0-100
-    }},
+    },
 
-    "confidence_assessment": {{
+    "confidence_assessment": {
         "overall_confidence": 0-100,
-        "confidence_by_dimension": {{
+        "confidence_by_dimension": {
             "competitive_analysis": 0-100,
             "market_sizing": 0-100,
             "unit_economics": 0-100,
             "management_assessment": 0-100,
             "financial_benchmarking": 0-100
-        }},
+        },
         "confidence_rationale": "Why this confidence level"
-    }},
-
-    "information_gaps": [
-        "Critical information still needed",
-        "Another gap",
-        "Third gap"
-    ],
-
-    "recommended_next_steps": [
-        {{
-            "step": "Next step description",
-            "priority": "high|medium|low",
-            "rationale": "Why this step is important"
-        }}
-    ]
-}}
+    }
+}
 
 IMPORTANT:
-- Be objective and data-driven in your analysis
-- Highlight both strengths AND weaknesses
-- Ensure recommendation aligns with the evidence
-- Identify genuine risks, not just theoretical concerns
-- Focus on actionable insights
+- Ensure scores align with the evidence
 - Return ONLY valid JSON, no other text"""
 
+# Token budgeting. Static instruction blocks are estimated once at import
+# (~4 chars per token), so per-call budgeting only has to measure the
+# dynamic context instead of re-counting the full prompt.
+_WORKFLOW_NAMES = {
+    "competitive_analysis": "COMPETITIVE ANALYSIS",
+    "market_sizing": "MARKET SIZING",
+    "unit_economics": "UNIT ECONOMICS",
+    "management_assessment": "MANAGEMENT ASSESSMENT",
+    "financial_benchmarking": "FINANCIAL BENCHMARKING"
+}
+
+_CHARS_PER_TOKEN = 4
+_CONTEXT_WINDOW_TOKENS = 200_000
+_MAX_OUTPUT_TOKENS = 1500
+_MIN_OUTPUT_TOKENS = 256
+
+_SUMMARY_TOKEN_ESTIMATE = len(_SUMMARY_INSTRUCTIONS) // _CHARS_PER_TOKEN
+_RISK_TOKEN_ESTIMATE = len(_RISK_INSTRUCTIONS) // _CHARS_PER_TOKEN
+_OPPORTUNITY_TOKEN_ESTIMATE = len(_OPPORTUNITY_INSTRUCTIONS) // _CHARS_PER_TOKEN
+_SCORING_TOKEN_ESTIMATE = len(_SCORING_INSTRUCTIONS) // _CHARS_PER_TOKEN
+
+def _budgeted_max_tokens(static_estimate: int, context: str) -> int:
+    """Reserve output tokens from what the prompt leaves of the window"""
+    prompt_estimate = static_estimate + len(context) // _CHARS_PER_TOKEN
+    available = _CONTEXT_WINDOW_TOKENS - prompt_estimate
+    return max(_MIN_OUTPUT_TOKENS, min(_MAX_OUTPUT_TOKENS, available))
+
+class SynthesisAgent:
+    """
+    Agent for synthesizing findings from multiple workflow analyses
+    into actionable investment insights and recommendations.
+    """
+
+    def __init__(self):
+        self.client = get_client()
+
+    async def synthesize(
+        self,
+        deal_name: str,
+        sector: str,
+        workflow_findings: Dict[str, Dict],
+        key_questions: List[str],
+        hypotheses: List[str]
+    ) -> Dict:
+        """
+        Synthesize findings from all workflows into comprehensive analysis.
+
+        Runs four focused sub-syntheses (summary, risks, opportunities,
+        scores) concurrently so wall-clock time is bounded by the slowest
+        call rather than one large serial generation.
+
+        Args:
+            deal_name: Name of the deal/company
+            sector: Industry sector
+            workflow_findings: Dict mapping workflow_type to findings
+            key_questions: Original key questions
+            hypotheses: Original hypotheses to test
+
+        Returns:
+            Dict with synthesis results including recommendation, insights, risks, etc.
+        """
+
+        # Prepare findings summary shared by all sub-prompts; each
+        # workflow's payload is serialized concurrently off the event
+        # loop since large findings dicts make this CPU-bound
+        sections = await asyncio.gather(*(
+            asyncio.to_thread(self._format_finding_section, workflow_type, findings)
+            for workflow_type, findings in workflow_findings.items()
+        ))
+        findings_text = "".join(sections)
+
+        context = f"""You are a senior PE investment professional synthesizing comprehensive due diligence findings.
+
+DEAL: {deal_name}
+SECTOR: {sector}
+
+ORIGINAL KEY QUESTIONS:
+{chr(10).join(f"- {q}" for q in key_questions)}
+
+ORIGINAL HYPOTHESES:
+{chr(10).join(f"- {h}" for h in hypotheses)}
+
+ANALYSIS FINDINGS:
+{findings_text}"""
+
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=8000,
-                messages=[{"role": "user", "content": prompt}]
+            summary, risks, opportunities, scores = await asyncio.gather(
+                self._summarize(context),
+                self._extract_risks(context),
+                self._extract_opportunities(context),
+                self._score_dimensions(context)
             )
 
-            content = response.content[0].text
-            result = json.loads(content)
+            result = {}
+            result.update(summary)
+            result.update(risks)
+            result.update(opportunities)
+            result.update(scores)
 
             return result
 
@@ -183,21 +267,67 @@ IMPORTANT:
                 }
             }
 
-    def _format_findings(self, workflow_findings: Dict[str, Dict]) -> str:
-        """Format workflow findings into readable text for the prompt"""
-        formatted = []
-
-        workflow_names = {
-            "competitive_analysis": "COMPETITIVE ANALYSIS",
-            "market_sizing": "MARKET SIZING",
-            "unit_economics": "UNIT ECONOMICS",
-            "management_assessment": "MANAGEMENT ASSESSMENT",
-            "financial_benchmarking": "FINANCIAL BENCHMARKING"
-        }
-
-        for workflow_type, findings in workflow_findings.items():
-            name = workflow_names.get(workflow_type, workflow_type.upper())
-            formatted.append(f"\n{'='*60}\n{name}\n{'='*60}")
-            formatted.append(json.dumps(findings, indent=2))
-
-        return "\n".join(formatted)
+    async def _summarize(self, context: str) -> Dict:
+        """Generate executive summary, key insights, and recommendation"""
+        result = await self._complete(
+            context + _SUMMARY_INSTRUCTIONS,
+            _budgeted_max_tokens(_SUMMARY_TOKEN_ESTIMATE, context)
+        )
+        return SummaryFragment.model_validate(result).model_dump()
+
+    async def _extract_risks(self, context: str) -> Dict:
+        """Extract key risks, mitigations, and information gaps"""
+        result = await self._complete(
+            context + _RISK_INSTRUCTIONS,
+            _budgeted_max_tokens(_RISK_TOKEN_ESTIMATE, context)
+        )
+        return RiskFragment.model_validate(result).model_dump()
+
+    async def _extract_opportunities(self, context: str) -> Dict:
+        """Extract opportunities, value creation levers, and next steps"""
+        result = await self._complete(
+            context + _OPPORTUNITY_INSTRUCTIONS,
+            _budgeted_max_tokens(_OPPORTUNITY_TOKEN_ESTIMATE, context)
+        )
+        return OpportunityFragment.model_validate(result).model_dump()
+
+    async def _score_dimensions(self, context: str) -> Dict:
+        """Score the deal across analysis dimensions with confidence levels"""
+        result = await self._complete(
+            context + _SCORING_INSTRUCTIONS,
+            _budgeted_max_tokens(_SCORING_TOKEN_ESTIMATE, context)
+        )
+        return ScoringFragment.model_validate(result).model_dump()
+
+    async def _complete(self, prompt: str, max_tokens: int = _MAX_OUTPUT_TOKENS) -> Dict:
+        """Send a sub-synthesis prompt to Claude and parse the JSON response"""
+        # Stream tokens as they arrive rather than buffering the whole
+        # generation server-side before the response body is delivered
+        chunks = []
+        async with self.client.messages.stream(
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                chunks.append(text)
+
+        return orjson.loads("".join(chunks))
+
+    def _format_finding_section(self, workflow_type: str, findings: Dict) -> str:
+        """Format one workflow's findings into readable text for the prompt"""
+        name = _WORKFLOW_NAMES.get(workflow_type, workflow_type.upper())
+
+        # Write straight into one growable buffer instead of collecting
+        # intermediate fragments and joining them afterwards
+        buf = StringIO()
+        separator = "=" * 60
+        buf.write(f"\n{separator}\n{name}\n{separator}\n")
+        buf.write(orjson.dumps(findings, option=orjson.OPT_INDENT_2).decode())
+        buf.write("\n")
+        return buf.getvalue()
+
+@lru_cache(maxsize=1)
+def get_synthesis_agent() -> SynthesisAgent:
+    """Process-wide agent instance; holds no per-request state"""
+    return SynthesisAgent()
@@ -1,4 +1,6 @@
+import time
 from datetime import datetime, timedelta
+from threading import Lock
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -6,6 +8,15 @@ from .config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Decoded-token cache: JWTs are self-validating and immutable, so the
+# signature check (an HMAC per request) only needs to run once per token
+# per minute. Expiry is still enforced on every hit, so caching never
+# extends a token's lifetime.
+_TOKEN_CACHE_TTL = 60.0
+_TOKEN_CACHE_MAX = 10_000
+_token_cache: dict[str, tuple[float, dict]] = {}
+_token_cache_lock = Lock()
+
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
     return pwd_context.hash(password)
@@ -32,3 +43,24 @@ def verify_token(token: str) -> dict:
         return payload
     except JWTError as e:
         raise ValueError(f"Invalid token: {e}")
+
+def verify_token_cached(token: str) -> dict:
+    """Verify a JWT token, reusing a recently decoded payload if present"""
+    now = time.monotonic()
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry and entry[0] > now:
+            payload = entry[1]
+            # The cache skips the HMAC, not expiry: re-check exp so a
+            # token can't outlive its claim by the cache TTL
+            if payload.get("exp", 0) > time.time():
+                return payload
+            del _token_cache[token]
+
+    payload = verify_token(token)
+
+    with _token_cache_lock:
+        if len(_token_cache) >= _TOKEN_CACHE_MAX:
+            _token_cache.clear()
+        _token_cache[token] = (now + _TOKEN_CACHE_TTL, payload)
+    return payload
@@ -9,6 +9,14 @@ class Settings(BaseSettings):
     # API Keys
     anthropic_api_key: str = ""
 
+    # Skill model tiers: the cheap/fast primary handles the common case,
+    # with one retry against the fallback when it returns unusable JSON
+    skill_model_primary: str = "claude-3-5-haiku-latest"
+    skill_model_fallback: str = "claude-3-5-sonnet-20241022"
+
+    # Cap on concurrent Anthropic calls when fanning out workflows
+    anthropic_max_concurrency: int = 4
+
     # Security
     secret_key: str = "dev-secret-key-change-in-production"
     algorithm: str = "HS256"
@@ -1,18 +1,50 @@
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+def _json_serializer(value) -> str:
+    """Serialize JSON column values with orjson instead of stdlib json"""
+    return orjson.dumps(value).decode()
+
 # Create database engine
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,  # Verify connections before using
-    echo=settings.environment == "development"
+    echo=settings.environment == "development",
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_database_url(url: str) -> str:
+    """Map the configured URL onto its async driver"""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+# Async engine for the request path; routers use this so queries don't
+# block the event loop while waiting on the database
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    pool_pre_ping=True,
+    echo=settings.environment == "development",
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads
+)
+
+# expire_on_commit=False keeps committed objects readable without
+# implicit lazy refreshes, which are not allowed on async sessions
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -26,3 +58,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Dependency for getting async database sessions.
+    Usage: db: AsyncSession = Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
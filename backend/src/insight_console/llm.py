@@ -0,0 +1,93 @@
+"""Shared Anthropic client for agents and skills.
+
+A single AsyncAnthropic instance reuses one httpx connection pool across
+all LLM callers instead of each agent paying client construction and
+fresh TLS handshakes per instance.
+"""
+import asyncio
+import httpx
+from anthropic import APIConnectionError, APIStatusError, AsyncAnthropic, DefaultAsyncHttpxClient
+from .config import settings
+
+_client: AsyncAnthropic | None = None
+
+def get_client() -> AsyncAnthropic:
+    """Return the process-wide AsyncAnthropic client, creating it lazily"""
+    global _client
+    if _client is None:
+        _client = AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            http_client=DefaultAsyncHttpxClient(
+                # Keep warm connections around for fan-out bursts
+                limits=httpx.Limits(max_keepalive_connections=32)
+            ),
+        )
+    return _client
+
+MAX_RETRIES = 3
+RETRY_BASE_DELAY_SECONDS = 1.0
+
+async def create_message_with_retry(**params):
+    """
+    Call messages.create on the shared client, retrying 429s, 5xx
+    responses, and connection errors with exponential backoff (1s, 2s, 4s).
+    """
+    client = get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return await client.messages.create(**params)
+        except APIConnectionError:
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+        except APIStatusError as e:
+            retryable = e.status_code == 429 or e.status_code >= 500
+            if not retryable or attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+
+async def stream_message_text(**params) -> str:
+    """
+    Stream a message and return the accumulated text, retrying 429s and
+    5xx responses like create_message_with_retry. Streaming overlaps
+    network transfer with accumulation and lets callers observe deltas
+    via messages.stream directly when they need them.
+    """
+    client = get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            chunks = []
+            async with client.messages.stream(**params) as stream:
+                async for text in stream.text_stream:
+                    chunks.append(text)
+            return "".join(chunks)
+        except APIConnectionError:
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+        except APIStatusError as e:
+            retryable = e.status_code == 429 or e.status_code >= 500
+            if not retryable or attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+
+async def stream_final_message(**params):
+    """
+    Stream a message to completion and return the final Message object
+    (needed for tool-use responses, whose input arrives as JSON deltas),
+    with the same 429/5xx retry policy as the helpers above.
+    """
+    client = get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with client.messages.stream(**params) as stream:
+                return await stream.get_final_message()
+        except APIConnectionError:
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+        except APIStatusError as e:
+            retryable = e.status_code == 429 or e.status_code >= 500
+            if not retryable or attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
@@ -3,6 +3,7 @@ from .user import User
 from .deal import Deal, DealStatus
 from .document import Document
 from .workflow import Workflow, WorkflowType, WorkflowStatus
-from .synthesis import Synthesis, SynthesisStatus, InvestmentRecommendation
+from .synthesis import Synthesis, SynthesisDetail, SynthesisStatus, InvestmentRecommendation
+from .audit_log import AuditLog
 
-__all__ = ["User", "Deal", "DealStatus", "Document", "Workflow", "WorkflowType", "WorkflowStatus", "Synthesis", "SynthesisStatus", "InvestmentRecommendation"]
+__all__ = ["User", "Deal", "DealStatus", "Document", "Workflow", "WorkflowType", "WorkflowStatus", "Synthesis", "SynthesisDetail", "SynthesisStatus", "InvestmentRecommendation", "AuditLog"]
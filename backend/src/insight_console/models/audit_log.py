@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy.dialects.postgresql import INET, JSONB
+from sqlalchemy.sql import func
+from insight_console.database import Base
+
+class AuditLog(Base):
+    """Audit log model for tracking user actions (maps the table from migration 006)"""
+
+    __tablename__ = "audit_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    firm_id = Column(String, nullable=False)
+    action = Column(String, nullable=False)  # create, read, update, delete, execute
+    resource_type = Column(String, nullable=False)  # deal, document, workflow, synthesis
+    resource_id = Column(Integer)
+    ip_address = Column(String().with_variant(INET(), "postgresql"))
+    user_agent = Column(Text)
+    # "metadata" is reserved on declarative models, so the attribute is
+    # named extra_data while the column keeps the migration's name
+    extra_data = Column("metadata", JSON().with_variant(JSONB(), "postgresql"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -34,7 +34,11 @@ class Deal(Base):
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Fetch server-generated timestamps via RETURNING on the INSERT so
+    # routers can respond without a follow-up refresh() SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     # Relationships
     created_by = relationship("User", foreign_keys=[created_by_id])
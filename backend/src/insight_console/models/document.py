@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from insight_console.database import Base
 
 class Document(Base):
@@ -14,9 +14,14 @@ class Document(Base):
     file_path = Column(String, nullable=False)  # Path in storage
     file_size = Column(BigInteger)  # Size in bytes
     mime_type = Column(String)
+    sha256 = Column(String(64), index=True)  # Content hash for dedup
     uploaded_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Fetch created_at via RETURNING on the INSERT so upload_document
+    # can respond without a follow-up refresh() SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
     # Relationships
-    deal = relationship("Deal", backref="documents")
+    deal = relationship("Deal", lazy="raise", backref=backref("documents", lazy="raise"))
     uploaded_by = relationship("User")
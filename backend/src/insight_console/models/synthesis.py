@@ -1,9 +1,15 @@
 import enum
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, JSON, Text, Float
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from insight_console.database import Base
 
+# JSONB on Postgres so the list/dict fields come back in binary form
+# instead of being re-parsed from text on every read; plain JSON on
+# other dialects (sqlite in tests)
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
 class SynthesisStatus(str, enum.Enum):
     """Synthesis generation status"""
     PENDING = "pending"
@@ -30,7 +36,7 @@ class Synthesis(Base):
 
     # Executive Summary
     executive_summary = Column(Text)  # High-level overview
-    key_insights = Column(JSON, default=list)  # List of key findings
+    key_insights = Column(JSONVariant, default=list)  # List of key findings
 
     # Investment Recommendation
     recommendation = Column(SQLEnum(InvestmentRecommendation))
@@ -38,30 +44,29 @@ class Synthesis(Base):
 
     # Confidence Scoring (0-100)
     overall_confidence = Column(Float)  # Overall confidence score
-    confidence_by_dimension = Column(JSON, default=dict)  # Confidence per workflow
+    confidence_by_dimension = Column(JSONVariant, default=dict)  # Confidence per workflow
 
     # Risk Assessment
-    key_risks = Column(JSON, default=list)  # Major risks identified
-    risk_mitigation = Column(JSON, default=list)  # Suggested mitigations
+    key_risks = Column(JSONVariant, default=list)  # Major risks identified
+    risk_mitigation = Column(JSONVariant, default=list)  # Suggested mitigations
 
     # Opportunities
-    key_opportunities = Column(JSON, default=list)  # Major opportunities
-    value_creation_levers = Column(JSON, default=list)  # How to create value
+    key_opportunities = Column(JSONVariant, default=list)  # Major opportunities
+    value_creation_levers = Column(JSONVariant, default=list)  # How to create value
 
     # Deal Metrics Summary
     deal_score = Column(Float)  # Overall deal score (0-100)
-    dimension_scores = Column(JSON, default=dict)  # Scores by analysis dimension
+    dimension_scores = Column(JSONVariant, default=dict)  # Scores by analysis dimension
 
-    # Compiled Findings
-    compiled_findings = Column(JSON, default=dict)  # All workflow findings consolidated
-    cross_workflow_insights = Column(JSON, default=list)  # Insights across workflows
+    # Compiled Findings (bulky raw payload lives in SynthesisDetail)
+    cross_workflow_insights = Column(JSONVariant, default=list)  # Insights across workflows
 
     # Next Steps
-    recommended_next_steps = Column(JSON, default=list)  # What to do next
-    information_gaps = Column(JSON, default=list)  # What info is missing
+    recommended_next_steps = Column(JSONVariant, default=list)  # What to do next
+    information_gaps = Column(JSONVariant, default=list)  # What info is missing
 
     # Metadata
-    workflows_included = Column(JSON, default=list)  # Which workflows were synthesized
+    workflows_included = Column(JSONVariant, default=list)  # Which workflows were synthesized
     error_message = Column(Text)  # If failed, what went wrong
 
     # Timestamps
@@ -69,4 +74,22 @@ class Synthesis(Base):
     completed_at = Column(DateTime(timezone=True))
 
     # Relationships
-    deal = relationship("Deal", backref="synthesis")
+    deal = relationship("Deal", lazy="raise", backref=backref("synthesis", lazy="raise"))
+
+class SynthesisDetail(Base):
+    """
+    Cold-storage side table for the bulky synthesis payload.
+
+    compiled_findings duplicates every workflow's raw findings and is
+    never returned by the API, so keeping it off the syntheses row keeps
+    that row narrow for the hot read path.
+    """
+
+    __tablename__ = "synthesis_details"
+
+    id = Column(Integer, primary_key=True, index=True)
+    synthesis_id = Column(Integer, ForeignKey("syntheses.id"), nullable=False, unique=True)
+    compiled_findings = Column(JSONVariant, default=dict)  # All workflow findings consolidated
+
+    # Relationships
+    synthesis = relationship("Synthesis", backref="detail")
@@ -1,7 +1,9 @@
 import enum
+from sys import intern
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, JSON, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from insight_console.database import Base
 
 class WorkflowType(str, enum.Enum):
@@ -20,6 +22,10 @@ class WorkflowStatus(str, enum.Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+# Precomputed, interned type values so the request-validation path does
+# pointer comparisons and no per-call list builds
+WORKFLOW_TYPE_VALUES = tuple(intern(t.value) for t in WorkflowType)
+
 class Workflow(Base):
     """Workflow model representing an analysis task"""
 
@@ -34,9 +40,11 @@ class Workflow(Base):
     progress_percent = Column(Integer, default=0)  # 0-100
     current_step = Column(String)  # Human-readable current step
 
-    # Results
-    findings = Column(JSON, default=dict)  # Structured findings
-    sources = Column(JSON, default=list)  # List of sources/citations
+    # Results; JSONB on Postgres so reads skip the text re-parse and
+    # containment filters on findings can use the GIN index
+    findings = Column(JSON().with_variant(JSONB(), "postgresql"), default=dict)  # Structured findings
+    content_hash = Column(String(64))  # sha256 of findings; skips idempotent rewrites
+    sources = Column(JSON().with_variant(JSONB(), "postgresql"), default=list)  # List of sources/citations
     error_message = Column(Text)  # If failed, what went wrong
 
     # Timestamps
@@ -45,4 +53,7 @@ class Workflow(Base):
     completed_at = Column(DateTime(timezone=True))
 
     # Relationships
-    deal = relationship("Deal", backref="workflows")
+    # lazy="raise" so an accidental lazy traversal fails loudly in tests
+    # instead of silently issuing an N+1 query per row; callers that need
+    # the relationship must load it explicitly with selectinload
+    deal = relationship("Deal", lazy="raise", backref=backref("workflows", lazy="raise"))
@@ -1,18 +1,29 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from insight_console.database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from insight_console.database import get_async_db, AsyncSessionLocal
 from insight_console.models.deal import Deal, DealStatus
 from insight_console.models.document import Document
-from insight_console.models.user import User
-from insight_console.models.workflow import Workflow, WorkflowType, WorkflowStatus
-from insight_console.agents.scope_extractor import ScopeExtractor
+from insight_console.models.workflow import (
+    Workflow,
+    WorkflowType,
+    WorkflowStatus,
+    WORKFLOW_TYPE_VALUES,
+)
+from insight_console.agents.scope_extractor import get_scope_extractor
+from insight_console.services.text_extraction import extract_texts_async
 from insight_console.services.workflow_executor import WorkflowExecutor
-from insight_console.routers.deals import get_current_user
+from insight_console.services.workflow_progress import get_progress
+from insight_console.routers.deals import get_owned_deal
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/deals/{deal_id}/analysis", tags=["analysis"])
 
+# Set membership beats WorkflowType(...) with try/except for filtering
+# scope recommendations: no exception raised per invalid value
+_VALID_WORKFLOW_TYPES = frozenset(WORKFLOW_TYPE_VALUES)
+
 class StartAnalysisResponse(BaseModel):
     """Response for starting analysis"""
     message: str
@@ -34,41 +45,29 @@ class WorkflowResponse(BaseModel):
 @router.post("/start", response_model=StartAnalysisResponse)
 async def start_analysis(
     deal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    deal: Deal = Depends(get_owned_deal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Start analysis for a deal by extracting scope from uploaded documents
     and preparing workflows.
     """
-    # Get deal
-    deal = db.query(Deal).filter(
-        Deal.id == deal_id,
-        Deal.firm_id == current_user.firm_id
-    ).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
-
     # Get documents
-    documents = db.query(Document).filter(Document.deal_id == deal_id).all()
+    result = await db.execute(select(Document).where(Document.deal_id == deal_id))
+    documents = result.scalars().all()
     if not documents:
         raise HTTPException(
             status_code=400,
             detail="No documents uploaded. Please upload deal materials first."
         )
 
-    # Extract text from documents (simplified - just read first doc for MVP)
-    # TODO: Implement proper PDF/DOCX text extraction
-    first_doc = documents[0]
-    try:
-        with open(first_doc.file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            text = f.read(10000)  # First 10k chars
-    except Exception:
-        text = ""
+    # Extract text from every document in parallel worker processes
+    texts = await extract_texts_async([doc.file_path for doc in documents])
+    text = "\n\n".join(t for t in texts if t)
 
     # Extract scope
-    extractor = ScopeExtractor()
-    scope = extractor.extract_scope(
+    extractor = get_scope_extractor()
+    scope = await extractor.extract_scope(
         text=text,
         sector=deal.sector or "Unknown",
         deal_type=deal.deal_type or "buyout"
@@ -78,24 +77,24 @@ async def start_analysis(
     deal.key_questions = scope["key_questions"]
     deal.hypotheses = scope["hypotheses"]
     deal.status = DealStatus.ANALYZING
-    db.commit()
+    await db.commit()
 
-    # Create workflows based on recommendations
-    for workflow_type_str in scope["recommended_workflows"]:
-        try:
-            workflow_type = WorkflowType(workflow_type_str)
-            workflow = Workflow(
-                deal_id=deal.id,
-                workflow_type=workflow_type,
-                status=WorkflowStatus.PENDING
-            )
-            db.add(workflow)
-        except ValueError:
-            # Skip invalid workflow types
-            continue
-
-    db.commit()
-    db.refresh(deal)
+    # Create workflows based on recommendations in one multi-row INSERT,
+    # silently dropping any workflow types we don't recognize
+    workflow_rows = [
+        {
+            "deal_id": deal.id,
+            "workflow_type": WorkflowType(workflow_type_str),
+            "status": WorkflowStatus.PENDING
+        }
+        for workflow_type_str in scope["recommended_workflows"]
+        if workflow_type_str in _VALID_WORKFLOW_TYPES
+    ]
+
+    if workflow_rows:
+        await db.execute(insert(Workflow).values(workflow_rows))
+
+    await db.commit()
 
     return StartAnalysisResponse(
         message="Analysis started. Workflows created.",
@@ -107,49 +106,63 @@ async def start_analysis(
 @router.get("/workflows", response_model=List[WorkflowResponse])
 async def list_workflows(
     deal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    deal: Deal = Depends(get_owned_deal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all workflows for a deal"""
-    deal = db.query(Deal).filter(
-        Deal.id == deal_id,
-        Deal.firm_id == current_user.firm_id
-    ).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
-
-    workflows = db.query(Workflow).filter(Workflow.deal_id == deal_id).all()
-    return workflows
-
-@router.post("/workflows/{workflow_id}/execute", response_model=WorkflowResponse)
+    result = await db.execute(select(Workflow).where(Workflow.deal_id == deal_id))
+    responses = []
+    for workflow in result.scalars():
+        response = WorkflowResponse.model_validate(workflow)
+        # Running workflows report progress through the in-process
+        # registry; the DB row only holds the terminal state. A row
+        # still PENDING in the DB may already be running in memory.
+        if workflow.status in (WorkflowStatus.PENDING, WorkflowStatus.RUNNING):
+            progress = get_progress(workflow.id)
+            if progress:
+                response.status = WorkflowStatus.RUNNING.value
+                response.progress_percent = progress["percent"]
+                response.current_step = progress["step"]
+        responses.append(response)
+    return responses
+
+async def _run_workflow(workflow_id: int):
+    """Execute a workflow outside the request with its own session"""
+    async with AsyncSessionLocal() as db:
+        executor = WorkflowExecutor(db)
+        try:
+            await executor.execute_workflow(workflow_id)
+        except Exception:
+            # Failure state is recorded on the workflow row by the executor
+            pass
+
+@router.post(
+    "/workflows/{workflow_id}/execute",
+    response_model=WorkflowResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
 async def execute_workflow(
     deal_id: int,
     workflow_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    deal: Deal = Depends(get_owned_deal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Execute a specific workflow"""
-    # Verify access
-    deal = db.query(Deal).filter(
-        Deal.id == deal_id,
-        Deal.firm_id == current_user.firm_id
-    ).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
-
-    workflow = db.query(Workflow).filter(
-        Workflow.id == workflow_id,
-        Workflow.deal_id == deal_id
-    ).first()
+    """
+    Start executing a specific workflow.
+
+    The skill's LLM calls run as a background task so the request
+    returns immediately; poll the workflows list for progress.
+    """
+    result = await db.execute(
+        select(Workflow).where(
+            Workflow.id == workflow_id,
+            Workflow.deal_id == deal_id
+        )
+    )
+    workflow = result.scalar_one_or_none()
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
 
-    # Execute workflow
-    executor = WorkflowExecutor(db)
-    try:
-        executor.execute_workflow(workflow_id)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Workflow execution failed: {str(e)}")
-
-    db.refresh(workflow)
+    background_tasks.add_task(_run_workflow, workflow_id)
     return workflow
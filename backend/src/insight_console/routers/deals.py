@@ -1,17 +1,28 @@
+import time
+from threading import Lock
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-from insight_console.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from insight_console.database import get_async_db
 from insight_console.models.deal import Deal, DealStatus
 from insight_console.models.user import User
 from insight_console.schemas.deal import DealCreate, DealResponse
-from insight_console.auth import verify_token
+from insight_console.auth import verify_token_cached
 
 router = APIRouter(prefix="/api/deals", tags=["deals"])
 
-def get_current_user(
+# Short-lived User cache so rapid consecutive requests from the same
+# principal skip the SELECT on users. Entries are detached instances
+# read only for id/firm_id; 30 s bounds how long a deleted user's token
+# keeps resolving.
+_USER_CACHE_TTL = 30.0
+_user_cache: dict[int, tuple[float, User]] = {}
+_user_cache_lock = Lock()
+
+async def get_current_user(
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user"""
     if not authorization or not authorization.startswith("Bearer "):
@@ -19,20 +30,48 @@ def get_current_user(
 
     token = authorization.replace("Bearer ", "")
     try:
-        payload = verify_token(token)
+        payload = verify_token_cached(token)
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
 
-    user = db.query(User).filter(User.id == payload["user_id"]).first()
+    user_id = payload["user_id"]
+    now = time.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+
+    with _user_cache_lock:
+        _user_cache[user_id] = (now + _USER_CACHE_TTL, user)
     return user
 
+async def get_owned_deal(
+    deal_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> Deal:
+    """Get the deal from the path, enforcing firm ownership"""
+    result = await db.execute(
+        select(Deal).where(
+            Deal.id == deal_id,
+            Deal.firm_id == current_user.firm_id
+        )
+    )
+    deal = result.scalar_one_or_none()
+    if not deal:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    return deal
+
 @router.post("", response_model=DealResponse, status_code=status.HTTP_201_CREATED)
-def create_deal(
+async def create_deal(
     deal_data: DealCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new deal"""
     deal = Deal(
@@ -45,30 +84,21 @@ def create_deal(
         status=DealStatus.DRAFT
     )
     db.add(deal)
-    db.commit()
-    db.refresh(deal)
+    await db.commit()
+    # Every response field is already in memory (eager_defaults fetches
+    # the timestamps on the INSERT), so no refresh round-trip is needed
     return deal
 
 @router.get("", response_model=List[DealResponse])
-def list_deals(
+async def list_deals(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all deals for the current user's firm"""
-    deals = db.query(Deal).filter(Deal.firm_id == current_user.firm_id).all()
-    return deals
+    result = await db.execute(select(Deal).where(Deal.firm_id == current_user.firm_id))
+    return result.scalars().all()
 
 @router.get("/{deal_id}", response_model=DealResponse)
-def get_deal(
-    deal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+async def get_deal(deal: Deal = Depends(get_owned_deal)):
     """Get a specific deal"""
-    deal = db.query(Deal).filter(
-        Deal.id == deal_id,
-        Deal.firm_id == current_user.firm_id
-    ).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
     return deal
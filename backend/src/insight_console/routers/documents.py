@@ -1,48 +1,85 @@
+import hashlib
 import os
-import shutil
+import uuid
+import aiofiles
 from typing import List
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from insight_console.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from insight_console.database import get_async_db
 from insight_console.models.deal import Deal
 from insight_console.models.document import Document
 from insight_console.models.user import User
 from insight_console.schemas.document import DocumentResponse
-from insight_console.routers.deals import get_current_user
+from insight_console.routers.deals import get_current_user, get_owned_deal
 
 router = APIRouter(prefix="/api/deals/{deal_id}/documents", tags=["documents"])
 
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024  # 100 MB
+
 @router.post("", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_document(
     deal_id: int,
+    request: Request,
     file: UploadFile = File(...),
+    deal: Deal = Depends(get_owned_deal),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload a document to a deal"""
-    # Verify deal exists and user has access
-    deal = db.query(Deal).filter(
-        Deal.id == deal_id,
-        Deal.firm_id == current_user.firm_id
-    ).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
+    # Reject oversized uploads from the Content-Length header before
+    # reading any of the body
+    content_length = int(request.headers.get("content-length", 0))
+    if content_length > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds maximum upload size of {MAX_UPLOAD_BYTES} bytes"
+        )
 
     # Create deal-specific directory
     deal_dir = UPLOAD_DIR / f"deal_{deal_id}"
     deal_dir.mkdir(exist_ok=True)
 
-    # Save file
-    file_path = deal_dir / file.filename
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Store under a generated name: the client filename is kept for
+    # display only, so path traversal ("../../etc/passwd") and two
+    # uploads racing on the same name can't touch anything outside
+    # deal_dir or clobber each other
+    stored_name = f"{uuid.uuid4().hex}{Path(file.filename).suffix.lower()}"
+    file_path = deal_dir / stored_name
+
+    # Stream to disk in chunks; copyfileobj would block the event loop
+    # and buffer the whole body through sync file I/O. The running cap
+    # backstops the header check against lying or chunked clients.
+    file_size = 0
+    digest = hashlib.sha256()
+    async with aiofiles.open(file_path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > MAX_UPLOAD_BYTES:
+                file_path.unlink(missing_ok=True)
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File exceeds maximum upload size of {MAX_UPLOAD_BYTES} bytes"
+                )
+            digest.update(chunk)
+            await buffer.write(chunk)
+    sha256 = digest.hexdigest()
 
-    # Get file size
-    file_size = file_path.stat().st_size
+    # Content-addressed dedup: if an identical file already exists on
+    # disk, hardlink to it instead of keeping a second copy
+    result = await db.execute(
+        select(Document).where(Document.sha256 == sha256).limit(1)
+    )
+    existing = result.scalar_one_or_none()
+    if existing and Path(existing.file_path).exists():
+        file_path.unlink(missing_ok=True)
+        os.link(existing.file_path, file_path)
 
     # Create document record
     document = Document(
@@ -51,27 +88,21 @@ async def upload_document(
         file_path=str(file_path),
         file_size=file_size,
         mime_type=file.content_type,
+        sha256=sha256,
         uploaded_by_id=current_user.id
     )
     db.add(document)
-    db.commit()
-    db.refresh(document)
+    await db.commit()
+    # Every response field is already in memory (eager_defaults fetches
+    # created_at on the INSERT), so no refresh round-trip is needed
     return document
 
 @router.get("", response_model=List[DocumentResponse])
-def list_documents(
+async def list_documents(
     deal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    deal: Deal = Depends(get_owned_deal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all documents for a deal"""
-    # Verify deal exists and user has access
-    deal = db.query(Deal).filter(
-        Deal.id == deal_id,
-        Deal.firm_id == current_user.firm_id
-    ).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
-
-    documents = db.query(Document).filter(Document.deal_id == deal_id).all()
-    return documents
+    result = await db.execute(select(Document).where(Document.deal_id == deal_id))
+    return result.scalars().all()
@@ -1,12 +1,14 @@
+from collections import OrderedDict
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from insight_console.database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from insight_console.database import get_async_db, SessionLocal
 from insight_console.models.deal import Deal
-from insight_console.models.synthesis import Synthesis
-from insight_console.models.user import User
+from insight_console.models.synthesis import Synthesis, SynthesisStatus
+from insight_console.models.workflow import Workflow, WorkflowStatus
 from insight_console.services.synthesis_service import SynthesisService
-from insight_console.routers.deals import get_current_user
+from insight_console.routers.deals import get_owned_deal
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -39,43 +41,70 @@ class SynthesisResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Validated responses for completed syntheses, keyed by
+# (deal_id, completed_at). Regeneration gets a new completed_at, so stale
+# entries simply stop being hit. Bounded LRU so memory stays flat.
+_response_cache: "OrderedDict[tuple, SynthesisResponse]" = OrderedDict()
+_RESPONSE_CACHE_MAX_SIZE = 128
+
 class GenerateSynthesisResponse(BaseModel):
     """Response for synthesis generation request"""
     message: str
     synthesis_id: int
     status: str
 
+async def _run_synthesis(deal_id: int):
+    """Run synthesis generation outside the request with its own session"""
+    db = SessionLocal()
+    try:
+        service = SynthesisService(db)
+        await service.generate_synthesis(deal_id)
+    except Exception:
+        # Failure state is recorded on the synthesis row by the service
+        pass
+    finally:
+        db.close()
+
 @router.post("/generate", response_model=GenerateSynthesisResponse)
 async def generate_synthesis(
     deal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    deal: Deal = Depends(get_owned_deal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Generate synthesis report by compiling all completed workflow findings.
-    """
-    # Verify deal access
-    deal = db.query(Deal).filter(
-        Deal.id == deal_id,
-        Deal.firm_id == current_user.firm_id
-    ).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
+    Start synthesis generation by compiling all completed workflow findings.
 
-    # Generate synthesis
-    service = SynthesisService(db)
-    try:
-        synthesis = service.generate_synthesis(deal_id)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
+    The LLM calls run as a background task so the request returns
+    immediately; poll GET /synthesis for completion.
+    """
+    # Validate up front so callers still get a 400 instead of a
+    # background failure they would only see when polling
+    result = await db.execute(
+        select(Workflow).where(
+            Workflow.deal_id == deal_id,
+            Workflow.status == WorkflowStatus.COMPLETED
+        ).limit(1)
+    )
+    if not result.scalar_one_or_none():
         raise HTTPException(
-            status_code=500,
-            detail=f"Synthesis generation failed: {str(e)}"
+            status_code=400,
+            detail=f"No completed workflows found for deal {deal_id}"
         )
 
+    # Create or reuse the synthesis row so the caller gets an id to poll
+    result = await db.execute(select(Synthesis).where(Synthesis.deal_id == deal_id))
+    synthesis = result.scalar_one_or_none()
+    if not synthesis:
+        synthesis = Synthesis(deal_id=deal_id, status=SynthesisStatus.PENDING)
+        db.add(synthesis)
+        await db.commit()
+        await db.refresh(synthesis)
+
+    background_tasks.add_task(_run_synthesis, deal_id)
+
     return GenerateSynthesisResponse(
-        message="Synthesis generated successfully",
+        message="Synthesis generation started",
         synthesis_id=synthesis.id,
         status=synthesis.status.value
     )
@@ -83,26 +112,35 @@ async def generate_synthesis(
 @router.get("", response_model=SynthesisResponse)
 async def get_synthesis(
     deal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    deal: Deal = Depends(get_owned_deal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get synthesis report for a deal.
     """
-    # Verify deal access
-    deal = db.query(Deal).filter(
-        Deal.id == deal_id,
-        Deal.firm_id == current_user.firm_id
-    ).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
-
     # Get synthesis
-    synthesis = db.query(Synthesis).filter(Synthesis.deal_id == deal_id).first()
+    result = await db.execute(select(Synthesis).where(Synthesis.deal_id == deal_id))
+    synthesis = result.scalar_one_or_none()
     if not synthesis:
         raise HTTPException(
             status_code=404,
             detail="No synthesis found for this deal. Generate one first."
         )
 
+    # Completed syntheses are immutable, so repeated dashboard refreshes
+    # can reuse the converted response instead of re-validating the
+    # large ORM row each time. Gate on status, not completed_at: a
+    # regenerating row keeps its old completed_at but must serve its
+    # live GENERATING state to polling clients.
+    if synthesis.status == SynthesisStatus.COMPLETED:
+        cache_key = (deal_id, synthesis.completed_at)
+        if cache_key in _response_cache:
+            _response_cache.move_to_end(cache_key)
+            return _response_cache[cache_key]
+        response = SynthesisResponse.model_validate(synthesis)
+        _response_cache[cache_key] = response
+        if len(_response_cache) > _RESPONSE_CACHE_MAX_SIZE:
+            _response_cache.popitem(last=False)
+        return response
+
     return synthesis
@@ -0,0 +1,51 @@
+"""Pydantic schemas for validating structured LLM output.
+
+Model classes compile their validators once at import, so per-call
+validation is a single fast core-validator pass instead of ad-hoc key
+checks on every parsed response. Fields default to empty values so a
+partially formed response degrades the same way the previous .get()
+handling did.
+"""
+from typing import Dict, List
+from pydantic import BaseModel, ConfigDict
+
+class ScopeExtractionResult(BaseModel):
+    """Shape of ScopeExtractor output"""
+    model_config = ConfigDict(extra="allow")
+
+    key_questions: List[str] = []
+    hypotheses: List[str] = []
+    recommended_workflows: List[str] = []
+
+class SummaryFragment(BaseModel):
+    """Shape of the synthesis executive-summary sub-response"""
+    model_config = ConfigDict(extra="allow")
+
+    executive_summary: str = ""
+    key_insights: List = []
+    investment_recommendation: Dict = {}
+    hypothesis_validation: List = []
+    cross_workflow_insights: List = []
+
+class RiskFragment(BaseModel):
+    """Shape of the synthesis risk sub-response"""
+    model_config = ConfigDict(extra="allow")
+
+    key_risks: List = []
+    risk_mitigation: List = []
+    information_gaps: List = []
+
+class OpportunityFragment(BaseModel):
+    """Shape of the synthesis opportunity sub-response"""
+    model_config = ConfigDict(extra="allow")
+
+    key_opportunities: List = []
+    value_creation_levers: List = []
+    recommended_next_steps: List = []
+
+class ScoringFragment(BaseModel):
+    """Shape of the synthesis scoring sub-response"""
+    model_config = ConfigDict(extra="allow")
+
+    dimension_scores: Dict = {}
+    confidence_assessment: Dict = {}
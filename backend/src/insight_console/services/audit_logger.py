@@ -0,0 +1,52 @@
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from insight_console.models.audit_log import AuditLog
+
+class AuditLogger:
+    """
+    Buffered audit logger.
+
+    Events are accumulated in memory and written in a single multi-row
+    INSERT (executemany) rather than one INSERT round-trip per event,
+    so audit logging adds one database call per flush instead of one
+    per request.
+    """
+
+    def __init__(self, db: Session, flush_threshold: int = 50):
+        self.db = db
+        self.flush_threshold = flush_threshold
+        self._buffer: List[dict] = []
+
+    def log(
+        self,
+        firm_id: str,
+        action: str,
+        resource_type: str,
+        user_id: Optional[int] = None,
+        resource_id: Optional[int] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> None:
+        """Queue an audit event; flushes automatically at the threshold"""
+        self._buffer.append({
+            "firm_id": firm_id,
+            "action": action,
+            "resource_type": resource_type,
+            "user_id": user_id,
+            "resource_id": resource_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "extra_data": metadata
+        })
+        if len(self._buffer) >= self.flush_threshold:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered events in one batched INSERT"""
+        if not self._buffer:
+            return
+        self.db.execute(insert(AuditLog), self._buffer)
+        self.db.commit()
+        self._buffer = []
@@ -1,9 +1,12 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
-from insight_console.models.synthesis import Synthesis, SynthesisStatus, InvestmentRecommendation
+from insight_console.models.synthesis import Synthesis, SynthesisDetail, SynthesisStatus, InvestmentRecommendation
 from insight_console.models.workflow import Workflow, WorkflowStatus
 from insight_console.models.deal import Deal, DealStatus
-from insight_console.agents.synthesis_agent import SynthesisAgent
+from insight_console.agents.synthesis_agent import get_synthesis_agent
+
+# Built once instead of per _map_recommendation call
+_RECOMMENDATION_MAP = {r.value: r for r in InvestmentRecommendation}
 
 class SynthesisService:
     """Service for generating synthesis from completed workflows"""
@@ -11,7 +14,7 @@ class SynthesisService:
     def __init__(self, db: Session):
         self.db = db
 
-    def generate_synthesis(self, deal_id: int) -> Synthesis:
+    async def generate_synthesis(self, deal_id: int) -> Synthesis:
         """
         Generate synthesis for a deal by compiling all completed workflow findings.
 
@@ -61,8 +64,8 @@ class SynthesisService:
                 workflows_included.append(workflow_type)
 
             # Run synthesis agent
-            agent = SynthesisAgent()
-            result = agent.synthesize(
+            agent = get_synthesis_agent()
+            result = await agent.synthesize(
                 deal_name=deal.target_company or deal.name,
                 sector=deal.sector or "Unknown",
                 workflow_findings=workflow_findings,
@@ -96,8 +99,14 @@ class SynthesisService:
             synthesis.deal_score = dimension_scores.get("overall_score", 50.0)
             synthesis.dimension_scores = dimension_scores
 
-            # Compiled data
-            synthesis.compiled_findings = workflow_findings
+            # Compiled data (bulky raw findings live in the side table)
+            detail = self.db.query(SynthesisDetail).filter(
+                SynthesisDetail.synthesis_id == synthesis.id
+            ).first()
+            if not detail:
+                detail = SynthesisDetail(synthesis_id=synthesis.id)
+                self.db.add(detail)
+            detail.compiled_findings = workflow_findings
             synthesis.cross_workflow_insights = result.get("cross_workflow_insights", [])
 
             # Next steps and gaps
@@ -128,11 +137,4 @@ class SynthesisService:
 
     def _map_recommendation(self, rec_str: str) -> InvestmentRecommendation:
         """Map string recommendation to enum"""
-        mapping = {
-            "strong_buy": InvestmentRecommendation.STRONG_BUY,
-            "buy": InvestmentRecommendation.BUY,
-            "hold": InvestmentRecommendation.HOLD,
-            "pass": InvestmentRecommendation.PASS,
-            "strong_pass": InvestmentRecommendation.STRONG_PASS
-        }
-        return mapping.get(rec_str.lower(), InvestmentRecommendation.PASS)
+        return _RECOMMENDATION_MAP.get(rec_str.lower(), InvestmentRecommendation.PASS)
@@ -0,0 +1,52 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+import pymupdf
+
+# Parsing PDFs is CPU-bound, so extraction runs one worker process per
+# document, sidestepping the GIL. Workers receive only the file path,
+# never parsed objects, so there is nothing expensive to pickle.
+_EXTRACTION_POOL = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 4))
+
+DEFAULT_MAX_CHARS = 10000
+
+def extract_text(file_path: str, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """
+    Extract text from a document.
+
+    PDFs are parsed with PyMuPDF page by page, stopping once max_chars
+    is reached; anything else falls back to a plain text read. Returns
+    an empty string if the file cannot be read.
+    """
+    try:
+        if file_path.lower().endswith(".pdf"):
+            parts = []
+            length = 0
+            with pymupdf.open(file_path) as doc:
+                for page in doc:
+                    text = page.get_text()
+                    parts.append(text)
+                    length += len(text)
+                    if length >= max_chars:
+                        break
+            return "".join(parts)[:max_chars]
+
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read(max_chars)
+    except Exception:
+        return ""
+
+async def extract_text_async(file_path: str, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """Run extract_text in a worker process"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_EXTRACTION_POOL, extract_text, file_path, max_chars)
+
+async def extract_texts_async(
+    file_paths: List[str],
+    max_chars: int = DEFAULT_MAX_CHARS
+) -> List[str]:
+    """Extract several documents concurrently, one worker process each"""
+    return await asyncio.gather(*(
+        extract_text_async(path, max_chars) for path in file_paths
+    ))
@@ -0,0 +1,26 @@
+"""In-process progress registry for running workflows.
+
+Intermediate progress updates are transient: nothing reads them once a
+workflow reaches a terminal state, so committing each one to Postgres
+just adds fsync round-trips. Running workflows publish progress here
+instead, and only the terminal COMPLETED/FAILED state is persisted.
+"""
+from threading import Lock
+
+_lock = Lock()
+_progress: dict[int, dict] = {}
+
+def set_progress(workflow_id: int, percent: int, step: str) -> None:
+    """Record the current progress of a running workflow."""
+    with _lock:
+        _progress[workflow_id] = {"percent": percent, "step": step}
+
+def get_progress(workflow_id: int) -> dict | None:
+    """Return the latest progress for a workflow, or None if not running."""
+    with _lock:
+        return _progress.get(workflow_id)
+
+def clear_progress(workflow_id: int) -> None:
+    """Drop the progress entry once a workflow reaches a terminal state."""
+    with _lock:
+        _progress.pop(workflow_id, None)
@@ -0,0 +1,50 @@
+"""In-process result cache for sector-generic skill calls.
+
+Market sizing and financial benchmarking depend on the sector and the
+key questions, not the individual company, so deals in the same sector
+produce effectively identical prompts. Caching their findings for a day
+(industry data doesn't move faster) skips the Anthropic call entirely
+on a hit. Company-specific skills (competitive analysis, management
+assessment) must not use this cache.
+"""
+import hashlib
+import orjson
+import time
+from threading import Lock
+
+TTL_SECONDS = 24 * 60 * 60
+MAX_ENTRIES = 1024
+
+_lock = Lock()
+_entries: dict[str, tuple[float, dict]] = {}
+
+def make_key(skill: str, sector: str, key_questions: list, context: str) -> str:
+    """Stable hash of everything the cached skills' output depends on"""
+    payload = orjson.dumps(
+        {
+            "skill": skill,
+            "sector": sector,
+            "key_questions": sorted(key_questions),
+            "context": context,
+        },
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+def get(key: str) -> dict | None:
+    """Return the cached findings for a key, or None if absent/expired"""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        if entry:
+            del _entries[key]
+    return None
+
+def put(key: str, value: dict) -> None:
+    """Cache findings under a key for TTL_SECONDS"""
+    with _lock:
+        if len(_entries) >= MAX_ENTRIES:
+            _entries.clear()
+        _entries[key] = (time.monotonic() + TTL_SECONDS, value)
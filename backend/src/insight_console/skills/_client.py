@@ -0,0 +1,15 @@
+"""Shared synchronous Anthropic client for the skills.
+
+A single client means one httpx connection pool with keep-alive, so
+repeat skill calls reuse warm TCP/TLS connections instead of paying a
+handshake per skill instance. The async path shares its own client via
+insight_console.llm.
+"""
+from anthropic import Anthropic
+from insight_console.config import settings
+
+client = Anthropic(
+    api_key=settings.anthropic_api_key,
+    max_retries=3,
+    timeout=60.0,
+)
@@ -0,0 +1,16 @@
+"""Shared prompt-building helpers for the skills."""
+from typing import List, Tuple
+
+
+def filter_questions(key_questions: List[str], terms: Tuple[str, ...]) -> str:
+    """
+    Render the key questions that mention any of the given terms as a
+    bulleted block. Each question is lowercased once instead of once per
+    term, and the output is deterministic so cached prompts stay stable.
+    """
+    lowered = [q.lower() for q in key_questions]
+    return "\n".join(
+        f"- {key_questions[i]}"
+        for i, low in enumerate(lowered)
+        if any(term in low for term in terms)
+    )
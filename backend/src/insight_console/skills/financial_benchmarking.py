@@ -1,146 +1,352 @@
-from typing import Dict, List
-from anthropic import Anthropic
+import logging
+from typing import Dict, List, Optional
 from insight_console.config import settings
-import json
+from insight_console.llm import get_client, stream_final_message, stream_message_text
+from insight_console.skills._client import client as anthropic_client
+from insight_console.skills._utils import filter_questions
+from insight_console.skills import _cache
+import orjson
 
-class FinancialBenchmarkingSkill:
-    """
-    Claude skill for financial benchmarking analysis.
-    Compares company financial metrics against industry benchmarks and peers.
-    """
+logger = logging.getLogger(__name__)
 
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.anthropic_api_key)
+# Static role and schema instructions, kept byte-identical across
+# calls so Anthropic serves them from the ephemeral prompt cache;
+# everything deal-specific goes in the user message
+# Key questions mentioning any of these terms are relevant to this skill
+QUESTION_TERMS = ('benchmark', 'financial', 'metric', 'performance', 'comparison', 'peer')
 
-    def execute(
-        self,
-        company_name: str,
-        sector: str,
-        key_questions: List[str],
-        context: str = ""
-    ) -> Dict:
-        """
-        Execute financial benchmarking workflow.
-
-        Returns dict with:
-        - revenue_metrics: Revenue benchmarks and comparison
-        - profitability_metrics: Margin benchmarks
-        - efficiency_metrics: Operational efficiency ratios
-        - growth_metrics: Growth rate comparisons
-        - sources: Citations
-        """
-
-        prompt = f"""You are a financial analyst conducting benchmarking analysis for a PE deal.
-
-Company: {company_name}
-Sector: {sector}
-
-Key Questions:
-{chr(10).join(f"- {q}" for q in key_questions if any(term in q.lower() for term in ["benchmark", "financial", "metric", "performance", "comparison", "peer"]))}
-
-Additional Context:
-{context}
+SYSTEM_PROMPT = """You are a financial analyst conducting benchmarking analysis for a PE deal.
 
 Conduct a financial benchmarking analysis and return JSON with this structure:
-{{
-    "revenue_metrics": {{
-        "revenue_growth": {{
+{
+    "revenue_metrics": {
+        "revenue_growth": {
             "company_metric": "X% YoY",
             "industry_median": "Y% YoY",
             "industry_top_quartile": "Z% YoY",
             "assessment": "above/at/below benchmark"
-        }},
-        "revenue_per_employee": {{
+        },
+        "revenue_per_employee": {
             "company_metric": "$X",
             "industry_median": "$Y",
             "assessment": "above/at/below benchmark"
-        }},
-        "arr_per_customer": {{
+        },
+        "arr_per_customer": {
             "company_metric": "$X (if applicable)",
             "industry_median": "$Y",
             "assessment": "above/at/below benchmark"
-        }}
-    }},
-    "profitability_metrics": {{
-        "gross_margin": {{
+        }
+    },
+    "profitability_metrics": {
+        "gross_margin": {
             "company_metric": "X%",
             "industry_median": "Y%",
             "industry_top_quartile": "Z%",
             "assessment": "above/at/below benchmark"
-        }},
-        "ebitda_margin": {{
+        },
+        "ebitda_margin": {
             "company_metric": "X%",
             "industry_median": "Y%",
             "assessment": "above/at/below benchmark"
-        }},
-        "operating_margin": {{
+        },
+        "operating_margin": {
             "company_metric": "X%",
             "industry_median": "Y%",
             "assessment": "above/at/below benchmark"
-        }}
-    }},
-    "efficiency_metrics": {{
-        "sales_efficiency": {{
+        }
+    },
+    "efficiency_metrics": {
+        "sales_efficiency": {
             "company_metric": "Description or ratio",
             "industry_median": "Benchmark",
             "assessment": "above/at/below benchmark"
-        }},
-        "r_and_d_as_percentage_revenue": {{
+        },
+        "r_and_d_as_percentage_revenue": {
             "company_metric": "X%",
             "industry_median": "Y%",
             "assessment": "above/at/below benchmark"
-        }},
-        "operating_leverage": {{
+        },
+        "operating_leverage": {
             "assessment": "Description of operating leverage",
             "trend": "improving/stable/deteriorating"
-        }}
-    }},
-    "growth_metrics": {{
-        "rule_of_40": {{
+        }
+    },
+    "growth_metrics": {
+        "rule_of_40": {
             "company_score": "Growth% + Margin% = X",
             "industry_median": "Y",
             "assessment": "Strong/Adequate/Weak performance"
-        }},
-        "growth_efficiency": {{
+        },
+        "growth_efficiency": {
             "metric": "Growth per dollar spent (if applicable)",
             "assessment": "Efficiency evaluation"
-        }}
-    }},
-    "capital_efficiency": {{
+        }
+    },
+    "capital_efficiency": {
         "burn_multiple": "If applicable for growth companies",
         "cash_conversion": "Cash generation capability",
         "working_capital": "Working capital efficiency"
-    }},
-    "overall_assessment": {{
+    },
+    "overall_assessment": {
         "relative_performance": "Overall performance vs peers",
         "key_strengths": ["strength 1", "strength 2"],
         "key_weaknesses": ["weakness 1", "weakness 2"],
         "valuation_implications": "How metrics impact valuation"
-    }},
+    },
     "sources": ["source 1", "source 2"]
-}}
+}
 
-Base your benchmarks on typical {sector} industry standards. Provide reasonable estimates for industry medians and note all assumptions."""
+Base your benchmarks on standards typical for the target company's sector. Provide reasonable estimates for industry medians and note all assumptions."""
 
-        try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+SYSTEM_BLOCKS = [{
+    "type": "text",
+    "text": SYSTEM_PROMPT,
+    "cache_control": {"type": "ephemeral"},
+}]
+
+
+# Forced tool call whose input_schema is the findings shape; reading
+# the tool input instead of parsing freeform text removes JSON-parse
+# failures entirely. Field details are described in SYSTEM_PROMPT, and
+# cache_control keeps the definition in the tools cache tier.
+SUBMIT_TOOL = {
+    "name": "submit_analysis",
+    "description": "Submit the completed financial benchmarking findings",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "revenue_metrics": {"type": "object"},
+            "profitability_metrics": {"type": "object"},
+            "efficiency_metrics": {"type": "object"},
+            "growth_metrics": {"type": "object"},
+            "capital_efficiency": {"type": "object"},
+            "overall_assessment": {"type": "object"},
+            "sources": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["revenue_metrics", "profitability_metrics", "efficiency_metrics", "growth_metrics", "capital_efficiency", "overall_assessment", "sources"]
+    },
+    "cache_control": {"type": "ephemeral"},
+}
+
+class FinancialBenchmarkingSkill:
+    """
+    Claude skill for financial benchmarking analysis.
+    Compares company financial metrics against industry benchmarks and peers.
+    """
+
+    MODEL = settings.skill_model_primary
+    FALLBACK_MODEL = settings.skill_model_fallback
+    SYSTEM = SYSTEM_BLOCKS
+    # Rough ceiling for the benchmark-table findings JSON; tables run
+    # longer than the other skills
+    MAX_TOKENS = 3000
+    BATCH_SIZE = 5  # marshalled rows per prompt; latency grows super-linearly past this
+    MAX_BATCH_TOKENS = 8192
+    TOOLS = [SUBMIT_TOOL]
+    TOOL_CHOICE = {"type": "tool", "name": "submit_analysis"}
+    REQUIRED_KEYS = ("revenue_metrics", "profitability_metrics", "overall_assessment")
+
+    def build_prompt(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> str:
+        """Build the deal-specific user message; the static schema lives in SYSTEM_BLOCKS"""
+        return f"""Company: {company_name}
+Sector: {sector}
+
+Key Questions:
+{filter_questions(key_questions, QUESTION_TERMS)}
 
-            content = response.content[0].text
-            result = json.loads(content)
+Additional Context:
+{context}"""
+
+    def parse_response(self, content: str) -> Dict:
+        """Parse the model's JSON response into the findings dict"""
+        return orjson.loads(content)
+
+    def error_result(self, error: str) -> Dict:
+        """Findings dict recording a failed execution"""
+        return {
+            "error": error,
+            "revenue_metrics": {},
+            "profitability_metrics": {},
+            "efficiency_metrics": {},
+            "growth_metrics": {},
+            "capital_efficiency": {},
+            "overall_assessment": {},
+            "sources": []
+        }
+
+    def _try_model(self, model: str, prompt: str) -> Optional[Dict]:
+        """Call one model tier; None if it does not yield a usable findings dict"""
+        with anthropic_client.messages.stream(
+            model=model,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            tools=self.TOOLS,
+            tool_choice=self.TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            response = stream.get_final_message()
+        self._log_usage(model, response)
+        return self._tool_input(response)
+
+    def _log_usage(self, model: str, response) -> None:
+        """Record output length so MAX_TOKENS can be re-tuned from logs"""
+        logger.debug(
+            "%s %s output_tokens=%d", type(self).__name__, model,
+            response.usage.output_tokens
+        )
+
+    def _tool_input(self, response) -> Optional[Dict]:
+        """Extract the forced tool call's input as the findings dict"""
+        block = response.content[0]
+        result = block.input if block.type == "tool_use" else None
+        if not isinstance(result, dict) or not all(key in result for key in self.REQUIRED_KEYS):
+            return None
+        return result
+
+    async def _atry_model(self, model: str, prompt: str) -> Optional[Dict]:
+        """Async counterpart of _try_model on the shared AsyncAnthropic client"""
+        response = await stream_final_message(
+            model=model,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            tools=self.TOOLS,
+            tool_choice=self.TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        self._log_usage(model, response)
+        return self._tool_input(response)
 
+    def execute(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> Dict:
+        """
+        Execute financial benchmarking workflow.
+
+        Returns dict with:
+        - revenue_metrics: Revenue benchmarks and comparison
+        - profitability_metrics: Margin benchmarks
+        - efficiency_metrics: Operational efficiency ratios
+        - growth_metrics: Growth rate comparisons
+        - sources: Citations
+        """
+        # Findings here are sector-level, so identical sector/questions
+        # can reuse a cached result instead of re-calling Anthropic
+        cache_key = _cache.make_key(type(self).__name__, sector, key_questions, context)
+        if (cached := _cache.get(cache_key)) is not None:
+            return cached
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        try:
+            result = self._try_model(self.MODEL, prompt)
+            if result is None:
+                # Primary tier returned unusable JSON; escalate once
+                result = self._try_model(self.FALLBACK_MODEL, prompt)
+                logger.info(
+                    "%s escalated to %s", type(self).__name__, self.FALLBACK_MODEL
+                )
+            if result is None:
+                return self.error_result("Model returned malformed findings JSON")
+            _cache.put(cache_key, result)
             return result
         except Exception as e:
-            return {
-                "error": str(e),
-                "revenue_metrics": {},
-                "profitability_metrics": {},
-                "efficiency_metrics": {},
-                "growth_metrics": {},
-                "capital_efficiency": {},
-                "overall_assessment": {},
-                "sources": []
-            }
+            return self.error_result(str(e))
+
+    async def aexecute(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> Dict:
+        """Async counterpart of execute so callers can fan out skills concurrently"""
+        # Findings here are sector-level, so identical sector/questions
+        # can reuse a cached result instead of re-calling Anthropic
+        cache_key = _cache.make_key(type(self).__name__, sector, key_questions, context)
+        if (cached := _cache.get(cache_key)) is not None:
+            return cached
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        try:
+            result = await self._atry_model(self.MODEL, prompt)
+            if result is None:
+                # Primary tier returned unusable JSON; escalate once
+                result = await self._atry_model(self.FALLBACK_MODEL, prompt)
+                logger.info(
+                    "%s escalated to %s", type(self).__name__, self.FALLBACK_MODEL
+                )
+            if result is None:
+                return self.error_result("Model returned malformed findings JSON")
+            _cache.put(cache_key, result)
+            return result
+        except Exception as e:
+            return self.error_result(str(e))
+
+    async def astream(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ):
+        """Yield response text deltas as they arrive, for interactive consumers"""
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        async with get_client().messages.stream(
+            model=self.MODEL,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for delta in stream.text_stream:
+                yield delta
+
+    def build_batch_prompt(self, companies: List[Dict]) -> str:
+        """User message packing several companies into one marshalled request"""
+        entries = [
+            f"Company {i}:\n" + self.build_prompt(**company)
+            for i, company in enumerate(companies, 1)
+        ]
+        return (
+            f"Analyze the following {len(companies)} companies. Return a JSON array "
+            f"of length {len(companies)} where element i is the JSON object described "
+            "in the schema for company i, in the same order.\n\n"
+            + "\n\n".join(entries)
+        )
+
+    async def aexecute_batch(self, companies: List[Dict]) -> List[Dict]:
+        """
+        Row-marshal several companies into shared prompts of up to
+        BATCH_SIZE rows each, amortizing the schema tokens across rows.
+        Each company dict takes the keyword arguments of build_prompt.
+        Returns one findings dict per company, in order.
+        """
+        results: List[Dict] = []
+        for start in range(0, len(companies), self.BATCH_SIZE):
+            results.extend(await self._aexecute_marshalled(companies[start:start + self.BATCH_SIZE]))
+        return results
+
+    async def _aexecute_marshalled(self, chunk: List[Dict]) -> List[Dict]:
+        """Run one marshalled prompt and split the array back into rows"""
+        try:
+            content = await stream_message_text(
+                model=self.MODEL,
+                max_tokens=min(self.MAX_TOKENS * len(chunk), self.MAX_BATCH_TOKENS),
+                system=SYSTEM_BLOCKS,
+                messages=[{"role": "user", "content": self.build_batch_prompt(chunk)}]
+            )
+            parsed = orjson.loads(content)
+            if not isinstance(parsed, list) or len(parsed) != len(chunk):
+                raise ValueError("Batched response is not an array matching the batch")
+        except Exception as e:
+            return [self.error_result(str(e)) for _ in chunk]
+        return [
+            item if isinstance(item, dict) else self.error_result("Malformed batch element")
+            for item in parsed
+        ]
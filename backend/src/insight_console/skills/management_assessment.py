@@ -1,127 +1,319 @@
-from typing import Dict, List
-from anthropic import Anthropic
+import logging
+from typing import Dict, List, Optional
 from insight_console.config import settings
-import json
+from insight_console.llm import get_client, stream_final_message, stream_message_text
+from insight_console.skills._client import client as anthropic_client
+from insight_console.skills._utils import filter_questions
+import orjson
 
-class ManagementAssessmentSkill:
-    """
-    Claude skill for management team assessment.
-    Evaluates leadership team capabilities, experience, and track record.
-    """
-
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.anthropic_api_key)
-
-    def execute(
-        self,
-        company_name: str,
-        sector: str,
-        key_questions: List[str],
-        context: str = ""
-    ) -> Dict:
-        """
-        Execute management assessment workflow.
-
-        Returns dict with:
-        - leadership_team: Key executives and backgrounds
-        - experience_assessment: Relevant experience evaluation
-        - track_record: Past performance and achievements
-        - gaps_and_risks: Identified gaps or concerns
-        - sources: Citations
-        """
-
-        prompt = f"""You are an executive assessment consultant evaluating the management team for a PE deal.
-
-Company: {company_name}
-Sector: {sector}
+logger = logging.getLogger(__name__)
 
-Key Questions:
-{chr(10).join(f"- {q}" for q in key_questions if any(term in q.lower() for term in ["management", "team", "leadership", "executive", "ceo", "founder"]))}
+# Static role and schema instructions, kept byte-identical across
+# calls so Anthropic serves them from the ephemeral prompt cache;
+# everything deal-specific goes in the user message
+# Key questions mentioning any of these terms are relevant to this skill
+QUESTION_TERMS = ('management', 'team', 'leadership', 'executive', 'ceo', 'founder')
 
-Additional Context:
-{context}
+SYSTEM_PROMPT = """You are an executive assessment consultant evaluating the management team for a PE deal.
 
 Conduct a management team assessment and return JSON with this structure:
-{{
-    "leadership_team": {{
-        "ceo": {{
+{
+    "leadership_team": {
+        "ceo": {
             "background": "Brief background and experience",
             "strengths": ["strength 1", "strength 2"],
             "experience_years_sector": "X years in sector",
             "previous_exits": "Any successful exits or major achievements"
-        }},
-        "cfo": {{
+        },
+        "cfo": {
             "background": "Brief background",
             "strengths": ["strength 1"],
             "experience_years": "X years"
-        }},
+        },
         "other_key_executives": [
-            {{
+            {
                 "role": "CTO/COO/etc",
                 "background": "Brief background",
                 "strengths": ["strength 1"]
-            }}
+            }
         ]
-    }},
-    "team_assessment": {{
+    },
+    "team_assessment": {
         "overall_quality": "strong/adequate/weak",
-        "domain_expertise": {{
+        "domain_expertise": {
             "rating": "high/medium/low",
             "justification": "Why this rating"
-        }},
-        "execution_capability": {{
+        },
+        "execution_capability": {
             "rating": "high/medium/low",
             "justification": "Evidence of execution capability"
-        }},
-        "scaling_experience": {{
+        },
+        "scaling_experience": {
             "rating": "high/medium/low",
             "justification": "Experience scaling similar businesses"
-        }}
-    }},
-    "track_record": {{
+        }
+    },
+    "track_record": {
         "key_achievements": ["achievement 1", "achievement 2"],
         "growth_milestones": ["milestone 1", "milestone 2"],
         "challenges_overcome": ["challenge 1", "challenge 2"]
-    }},
-    "gaps_and_risks": {{
+    },
+    "gaps_and_risks": {
         "identified_gaps": [
-            {{
+            {
                 "area": "Role or capability area",
                 "severity": "high/medium/low",
                 "description": "Description of the gap"
-            }}
+            }
         ],
         "succession_risks": "Assessment of key person dependencies",
         "mitigation_recommendations": ["recommendation 1", "recommendation 2"]
-    }},
-    "cultural_factors": {{
+    },
+    "cultural_factors": {
         "leadership_style": "Description of leadership approach",
         "alignment_with_growth": "How culture supports/hinders growth goals",
         "retention_risks": "Assessment of retention risks"
-    }},
+    },
     "sources": ["source 1", "source 2"]
-}}
+}
 
-Base your assessment on typical {sector} leadership requirements. Note any assumptions about publicly available information."""
+Base your assessment on leadership requirements typical for the target company's sector. Note any assumptions about publicly available information."""
 
-        try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+SYSTEM_BLOCKS = [{
+    "type": "text",
+    "text": SYSTEM_PROMPT,
+    "cache_control": {"type": "ephemeral"},
+}]
+
+
+# Forced tool call whose input_schema is the findings shape; reading
+# the tool input instead of parsing freeform text removes JSON-parse
+# failures entirely. Field details are described in SYSTEM_PROMPT, and
+# cache_control keeps the definition in the tools cache tier.
+SUBMIT_TOOL = {
+    "name": "submit_analysis",
+    "description": "Submit the completed management assessment findings",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "leadership_team": {"type": "object"},
+            "team_assessment": {"type": "object"},
+            "track_record": {"type": "object"},
+            "gaps_and_risks": {"type": "object"},
+            "cultural_factors": {"type": "object"},
+            "sources": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["leadership_team", "team_assessment", "track_record", "gaps_and_risks", "cultural_factors", "sources"]
+    },
+    "cache_control": {"type": "ephemeral"},
+}
+
+class ManagementAssessmentSkill:
+    """
+    Claude skill for management team assessment.
+    Evaluates leadership team capabilities, experience, and track record.
+    """
 
-            content = response.content[0].text
-            result = json.loads(content)
+    MODEL = settings.skill_model_primary
+    FALLBACK_MODEL = settings.skill_model_fallback
+    SYSTEM = SYSTEM_BLOCKS
+    # Rough ceiling for the per-executive findings JSON; assessments run
+    # longer than the other skills
+    MAX_TOKENS = 3000
+    BATCH_SIZE = 5  # marshalled rows per prompt; latency grows super-linearly past this
+    MAX_BATCH_TOKENS = 8192
+    TOOLS = [SUBMIT_TOOL]
+    TOOL_CHOICE = {"type": "tool", "name": "submit_analysis"}
+    REQUIRED_KEYS = ("leadership_team", "team_assessment", "gaps_and_risks")
+
+    def build_prompt(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> str:
+        """Build the deal-specific user message; the static schema lives in SYSTEM_BLOCKS"""
+        return f"""Company: {company_name}
+Sector: {sector}
+
+Key Questions:
+{filter_questions(key_questions, QUESTION_TERMS)}
+
+Additional Context:
+{context}"""
 
+    def parse_response(self, content: str) -> Dict:
+        """Parse the model's JSON response into the findings dict"""
+        return orjson.loads(content)
+
+    def error_result(self, error: str) -> Dict:
+        """Findings dict recording a failed execution"""
+        return {
+            "error": error,
+            "leadership_team": {},
+            "team_assessment": {},
+            "track_record": {},
+            "gaps_and_risks": {},
+            "cultural_factors": {},
+            "sources": []
+        }
+
+    def _try_model(self, model: str, prompt: str) -> Optional[Dict]:
+        """Call one model tier; None if it does not yield a usable findings dict"""
+        with anthropic_client.messages.stream(
+            model=model,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            tools=self.TOOLS,
+            tool_choice=self.TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            response = stream.get_final_message()
+        self._log_usage(model, response)
+        return self._tool_input(response)
+
+    def _log_usage(self, model: str, response) -> None:
+        """Record output length so MAX_TOKENS can be re-tuned from logs"""
+        logger.debug(
+            "%s %s output_tokens=%d", type(self).__name__, model,
+            response.usage.output_tokens
+        )
+
+    def _tool_input(self, response) -> Optional[Dict]:
+        """Extract the forced tool call's input as the findings dict"""
+        block = response.content[0]
+        result = block.input if block.type == "tool_use" else None
+        if not isinstance(result, dict) or not all(key in result for key in self.REQUIRED_KEYS):
+            return None
+        return result
+
+    async def _atry_model(self, model: str, prompt: str) -> Optional[Dict]:
+        """Async counterpart of _try_model on the shared AsyncAnthropic client"""
+        response = await stream_final_message(
+            model=model,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            tools=self.TOOLS,
+            tool_choice=self.TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        self._log_usage(model, response)
+        return self._tool_input(response)
+
+    def execute(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> Dict:
+        """
+        Execute management assessment workflow.
+
+        Returns dict with:
+        - leadership_team: Key executives and backgrounds
+        - experience_assessment: Relevant experience evaluation
+        - track_record: Past performance and achievements
+        - gaps_and_risks: Identified gaps or concerns
+        - sources: Citations
+        """
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        try:
+            result = self._try_model(self.MODEL, prompt)
+            if result is None:
+                # Primary tier returned unusable JSON; escalate once
+                result = self._try_model(self.FALLBACK_MODEL, prompt)
+                logger.info(
+                    "%s escalated to %s", type(self).__name__, self.FALLBACK_MODEL
+                )
+            if result is None:
+                return self.error_result("Model returned malformed findings JSON")
             return result
         except Exception as e:
-            return {
-                "error": str(e),
-                "leadership_team": {},
-                "team_assessment": {},
-                "track_record": {},
-                "gaps_and_risks": {},
-                "cultural_factors": {},
-                "sources": []
-            }
+            return self.error_result(str(e))
+
+    async def aexecute(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> Dict:
+        """Async counterpart of execute so callers can fan out skills concurrently"""
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        try:
+            result = await self._atry_model(self.MODEL, prompt)
+            if result is None:
+                # Primary tier returned unusable JSON; escalate once
+                result = await self._atry_model(self.FALLBACK_MODEL, prompt)
+                logger.info(
+                    "%s escalated to %s", type(self).__name__, self.FALLBACK_MODEL
+                )
+            if result is None:
+                return self.error_result("Model returned malformed findings JSON")
+            return result
+        except Exception as e:
+            return self.error_result(str(e))
+
+    async def astream(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ):
+        """Yield response text deltas as they arrive, for interactive consumers"""
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        async with get_client().messages.stream(
+            model=self.MODEL,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for delta in stream.text_stream:
+                yield delta
+
+    def build_batch_prompt(self, companies: List[Dict]) -> str:
+        """User message packing several companies into one marshalled request"""
+        entries = [
+            f"Company {i}:\n" + self.build_prompt(**company)
+            for i, company in enumerate(companies, 1)
+        ]
+        return (
+            f"Analyze the following {len(companies)} companies. Return a JSON array "
+            f"of length {len(companies)} where element i is the JSON object described "
+            "in the schema for company i, in the same order.\n\n"
+            + "\n\n".join(entries)
+        )
+
+    async def aexecute_batch(self, companies: List[Dict]) -> List[Dict]:
+        """
+        Row-marshal several companies into shared prompts of up to
+        BATCH_SIZE rows each, amortizing the schema tokens across rows.
+        Each company dict takes the keyword arguments of build_prompt.
+        Returns one findings dict per company, in order.
+        """
+        results: List[Dict] = []
+        for start in range(0, len(companies), self.BATCH_SIZE):
+            results.extend(await self._aexecute_marshalled(companies[start:start + self.BATCH_SIZE]))
+        return results
+
+    async def _aexecute_marshalled(self, chunk: List[Dict]) -> List[Dict]:
+        """Run one marshalled prompt and split the array back into rows"""
+        try:
+            content = await stream_message_text(
+                model=self.MODEL,
+                max_tokens=min(self.MAX_TOKENS * len(chunk), self.MAX_BATCH_TOKENS),
+                system=SYSTEM_BLOCKS,
+                messages=[{"role": "user", "content": self.build_batch_prompt(chunk)}]
+            )
+            parsed = orjson.loads(content)
+            if not isinstance(parsed, list) or len(parsed) != len(chunk):
+                raise ValueError("Batched response is not an array matching the batch")
+        except Exception as e:
+            return [self.error_result(str(e)) for _ in chunk]
+        return [
+            item if isinstance(item, dict) else self.error_result("Malformed batch element")
+            for item in parsed
+        ]
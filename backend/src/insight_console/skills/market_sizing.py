@@ -1,7 +1,84 @@
-from typing import Dict, List
-from anthropic import Anthropic
+import logging
+from typing import Dict, List, Optional
 from insight_console.config import settings
-import json
+from insight_console.llm import get_client, stream_final_message, stream_message_text
+from insight_console.skills._client import client as anthropic_client
+from insight_console.skills._utils import filter_questions
+from insight_console.skills import _cache
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Static role and schema instructions, kept byte-identical across
+# calls so Anthropic serves them from the ephemeral prompt cache;
+# everything deal-specific goes in the user message
+# Key questions mentioning any of these terms are relevant to this skill
+QUESTION_TERMS = ('market', 'growth', 'size')
+
+SYSTEM_PROMPT = """You are a market research analyst conducting market sizing for a PE deal.
+
+Conduct a market sizing analysis and return JSON with this structure:
+{
+    "market_size": {
+        "tam": {
+            "value_usd": "Total addressable market in USD",
+            "methodology": "How this was calculated",
+            "assumptions": ["assumption 1", "assumption 2"]
+        },
+        "sam": {
+            "value_usd": "Serviceable addressable market in USD",
+            "methodology": "How this was calculated",
+            "percentage_of_tam": "X%"
+        },
+        "som": {
+            "value_usd": "Serviceable obtainable market in USD",
+            "methodology": "How this was calculated",
+            "percentage_of_sam": "X%"
+        }
+    },
+    "growth_analysis": {
+        "historical_cagr": "X% (timeframe)",
+        "projected_cagr": "X% (timeframe)",
+        "growth_drivers": ["driver 1", "driver 2"],
+        "growth_barriers": ["barrier 1", "barrier 2"]
+    },
+    "market_dynamics": {
+        "market_maturity": "emerging/growth/mature/declining",
+        "key_trends": ["trend 1", "trend 2"],
+        "regulatory_factors": ["factor 1", "factor 2"],
+        "technology_impact": "Description of how technology affects the market"
+    },
+    "sources": ["source 1", "source 2"]
+}
+
+Base your analysis on general knowledge of the target company's industry. Provide reasonable estimates and clearly note assumptions."""
+
+SYSTEM_BLOCKS = [{
+    "type": "text",
+    "text": SYSTEM_PROMPT,
+    "cache_control": {"type": "ephemeral"},
+}]
+
+
+# Forced tool call whose input_schema is the findings shape; reading
+# the tool input instead of parsing freeform text removes JSON-parse
+# failures entirely. Field details are described in SYSTEM_PROMPT, and
+# cache_control keeps the definition in the tools cache tier.
+SUBMIT_TOOL = {
+    "name": "submit_analysis",
+    "description": "Submit the completed market sizing findings",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "market_size": {"type": "object"},
+            "growth_analysis": {"type": "object"},
+            "market_dynamics": {"type": "object"},
+            "sources": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["market_size", "growth_analysis", "market_dynamics", "sources"]
+    },
+    "cache_control": {"type": "ephemeral"},
+}
 
 class MarketSizingSkill:
     """
@@ -9,8 +86,90 @@ class MarketSizingSkill:
     Analyzes TAM, SAM, SOM, market growth, and market dynamics.
     """
 
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.anthropic_api_key)
+    MODEL = settings.skill_model_primary
+    FALLBACK_MODEL = settings.skill_model_fallback
+    SYSTEM = SYSTEM_BLOCKS
+    # Rough ceiling for the TAM/SAM/SOM findings JSON; kept small so the
+    # reservation doesn't inflate per-request latency
+    MAX_TOKENS = 2000
+    BATCH_SIZE = 5  # marshalled rows per prompt; latency grows super-linearly past this
+    MAX_BATCH_TOKENS = 8192
+    TOOLS = [SUBMIT_TOOL]
+    TOOL_CHOICE = {"type": "tool", "name": "submit_analysis"}
+    REQUIRED_KEYS = ("market_size", "growth_analysis", "market_dynamics")
+
+    def build_prompt(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> str:
+        """Build the deal-specific user message; the static schema lives in SYSTEM_BLOCKS"""
+        return f"""Company: {company_name}
+Sector: {sector}
+
+Key Questions:
+{filter_questions(key_questions, QUESTION_TERMS)}
+
+Additional Context:
+{context}"""
+
+    def parse_response(self, content: str) -> Dict:
+        """Parse the model's JSON response into the findings dict"""
+        return orjson.loads(content)
+
+    def error_result(self, error: str) -> Dict:
+        """Findings dict recording a failed execution"""
+        return {
+            "error": error,
+            "market_size": {},
+            "growth_analysis": {},
+            "market_dynamics": {},
+            "sources": []
+        }
+
+    def _try_model(self, model: str, prompt: str) -> Optional[Dict]:
+        """Call one model tier; None if it does not yield a usable findings dict"""
+        with anthropic_client.messages.stream(
+            model=model,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            tools=self.TOOLS,
+            tool_choice=self.TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            response = stream.get_final_message()
+        self._log_usage(model, response)
+        return self._tool_input(response)
+
+    def _log_usage(self, model: str, response) -> None:
+        """Record output length so MAX_TOKENS can be re-tuned from logs"""
+        logger.debug(
+            "%s %s output_tokens=%d", type(self).__name__, model,
+            response.usage.output_tokens
+        )
+
+    def _tool_input(self, response) -> Optional[Dict]:
+        """Extract the forced tool call's input as the findings dict"""
+        block = response.content[0]
+        result = block.input if block.type == "tool_use" else None
+        if not isinstance(result, dict) or not all(key in result for key in self.REQUIRED_KEYS):
+            return None
+        return result
+
+    async def _atry_model(self, model: str, prompt: str) -> Optional[Dict]:
+        """Async counterpart of _try_model on the shared AsyncAnthropic client"""
+        response = await stream_final_message(
+            model=model,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            tools=self.TOOLS,
+            tool_choice=self.TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        self._log_usage(model, response)
+        return self._tool_input(response)
 
     def execute(
         self,
@@ -28,70 +187,114 @@ class MarketSizingSkill:
         - market_dynamics: Key drivers, barriers, trends
         - sources: Citations
         """
+        # Findings here are sector-level, so identical sector/questions
+        # can reuse a cached result instead of re-calling Anthropic
+        cache_key = _cache.make_key(type(self).__name__, sector, key_questions, context)
+        if (cached := _cache.get(cache_key)) is not None:
+            return cached
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        try:
+            result = self._try_model(self.MODEL, prompt)
+            if result is None:
+                # Primary tier returned unusable JSON; escalate once
+                result = self._try_model(self.FALLBACK_MODEL, prompt)
+                logger.info(
+                    "%s escalated to %s", type(self).__name__, self.FALLBACK_MODEL
+                )
+            if result is None:
+                return self.error_result("Model returned malformed findings JSON")
+            _cache.put(cache_key, result)
+            return result
+        except Exception as e:
+            return self.error_result(str(e))
 
-        prompt = f"""You are a market research analyst conducting market sizing for a PE deal.
-
-Company: {company_name}
-Sector: {sector}
+    async def aexecute(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> Dict:
+        """Async counterpart of execute so callers can fan out skills concurrently"""
+        # Findings here are sector-level, so identical sector/questions
+        # can reuse a cached result instead of re-calling Anthropic
+        cache_key = _cache.make_key(type(self).__name__, sector, key_questions, context)
+        if (cached := _cache.get(cache_key)) is not None:
+            return cached
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        try:
+            result = await self._atry_model(self.MODEL, prompt)
+            if result is None:
+                # Primary tier returned unusable JSON; escalate once
+                result = await self._atry_model(self.FALLBACK_MODEL, prompt)
+                logger.info(
+                    "%s escalated to %s", type(self).__name__, self.FALLBACK_MODEL
+                )
+            if result is None:
+                return self.error_result("Model returned malformed findings JSON")
+            _cache.put(cache_key, result)
+            return result
+        except Exception as e:
+            return self.error_result(str(e))
 
-Key Questions:
-{chr(10).join(f"- {q}" for q in key_questions if "market" in q.lower() or "growth" in q.lower() or "size" in q.lower())}
+    async def astream(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ):
+        """Yield response text deltas as they arrive, for interactive consumers"""
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        async with get_client().messages.stream(
+            model=self.MODEL,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for delta in stream.text_stream:
+                yield delta
 
-Additional Context:
-{context}
+    def build_batch_prompt(self, companies: List[Dict]) -> str:
+        """User message packing several companies into one marshalled request"""
+        entries = [
+            f"Company {i}:\n" + self.build_prompt(**company)
+            for i, company in enumerate(companies, 1)
+        ]
+        return (
+            f"Analyze the following {len(companies)} companies. Return a JSON array "
+            f"of length {len(companies)} where element i is the JSON object described "
+            "in the schema for company i, in the same order.\n\n"
+            + "\n\n".join(entries)
+        )
 
-Conduct a market sizing analysis and return JSON with this structure:
-{{
-    "market_size": {{
-        "tam": {{
-            "value_usd": "Total addressable market in USD",
-            "methodology": "How this was calculated",
-            "assumptions": ["assumption 1", "assumption 2"]
-        }},
-        "sam": {{
-            "value_usd": "Serviceable addressable market in USD",
-            "methodology": "How this was calculated",
-            "percentage_of_tam": "X%"
-        }},
-        "som": {{
-            "value_usd": "Serviceable obtainable market in USD",
-            "methodology": "How this was calculated",
-            "percentage_of_sam": "X%"
-        }}
-    }},
-    "growth_analysis": {{
-        "historical_cagr": "X% (timeframe)",
-        "projected_cagr": "X% (timeframe)",
-        "growth_drivers": ["driver 1", "driver 2"],
-        "growth_barriers": ["barrier 1", "barrier 2"]
-    }},
-    "market_dynamics": {{
-        "market_maturity": "emerging/growth/mature/declining",
-        "key_trends": ["trend 1", "trend 2"],
-        "regulatory_factors": ["factor 1", "factor 2"],
-        "technology_impact": "Description of how technology affects the market"
-    }},
-    "sources": ["source 1", "source 2"]
-}}
-
-Base your analysis on general knowledge of the {sector} industry. Provide reasonable estimates and clearly note assumptions."""
+    async def aexecute_batch(self, companies: List[Dict]) -> List[Dict]:
+        """
+        Row-marshal several companies into shared prompts of up to
+        BATCH_SIZE rows each, amortizing the schema tokens across rows.
+        Each company dict takes the keyword arguments of build_prompt.
+        Returns one findings dict per company, in order.
+        """
+        results: List[Dict] = []
+        for start in range(0, len(companies), self.BATCH_SIZE):
+            results.extend(await self._aexecute_marshalled(companies[start:start + self.BATCH_SIZE]))
+        return results
 
+    async def _aexecute_marshalled(self, chunk: List[Dict]) -> List[Dict]:
+        """Run one marshalled prompt and split the array back into rows"""
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}]
+            content = await stream_message_text(
+                model=self.MODEL,
+                max_tokens=min(self.MAX_TOKENS * len(chunk), self.MAX_BATCH_TOKENS),
+                system=SYSTEM_BLOCKS,
+                messages=[{"role": "user", "content": self.build_batch_prompt(chunk)}]
             )
-
-            content = response.content[0].text
-            result = json.loads(content)
-
-            return result
+            parsed = orjson.loads(content)
+            if not isinstance(parsed, list) or len(parsed) != len(chunk):
+                raise ValueError("Batched response is not an array matching the batch")
         except Exception as e:
-            return {
-                "error": str(e),
-                "market_size": {},
-                "growth_analysis": {},
-                "market_dynamics": {},
-                "sources": []
-            }
+            return [self.error_result(str(e)) for _ in chunk]
+        return [
+            item if isinstance(item, dict) else self.error_result("Malformed batch element")
+            for item in parsed
+        ]
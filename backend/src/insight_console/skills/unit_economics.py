@@ -1,106 +1,298 @@
-from typing import Dict, List
-from anthropic import Anthropic
+import logging
+from typing import Dict, List, Optional
 from insight_console.config import settings
-import json
+from insight_console.llm import get_client, stream_final_message, stream_message_text
+from insight_console.skills._client import client as anthropic_client
+from insight_console.skills._utils import filter_questions
+import orjson
 
-class UnitEconomicsSkill:
-    """
-    Claude skill for unit economics analysis.
-    Analyzes CAC, LTV, payback periods, retention, and profitability metrics.
-    """
-
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.anthropic_api_key)
-
-    def execute(
-        self,
-        company_name: str,
-        sector: str,
-        key_questions: List[str],
-        context: str = ""
-    ) -> Dict:
-        """
-        Execute unit economics workflow.
-
-        Returns dict with:
-        - customer_metrics: CAC, LTV, payback period
-        - retention_metrics: Churn, NRR, GRR
-        - profitability: Unit margins, contribution margins
-        - sources: Citations
-        """
-
-        prompt = f"""You are a financial analyst conducting unit economics analysis for a PE deal.
+logger = logging.getLogger(__name__)
 
-Company: {company_name}
-Sector: {sector}
-
-Key Questions:
-{chr(10).join(f"- {q}" for q in key_questions if any(term in q.lower() for term in ["unit", "economics", "cac", "ltv", "retention", "churn", "margin"]))}
+# Static role and schema instructions, kept byte-identical across
+# calls so Anthropic serves them from the ephemeral prompt cache;
+# everything deal-specific goes in the user message
+# Key questions mentioning any of these terms are relevant to this skill
+QUESTION_TERMS = ('unit', 'economics', 'cac', 'ltv', 'retention', 'churn', 'margin')
 
-Additional Context:
-{context}
+SYSTEM_PROMPT = """You are a financial analyst conducting unit economics analysis for a PE deal.
 
 Conduct a unit economics analysis and return JSON with this structure:
-{{
-    "customer_acquisition": {{
-        "cac": {{
+{
+    "customer_acquisition": {
+        "cac": {
             "value_usd": "Customer acquisition cost in USD",
             "methodology": "How this was calculated",
             "trend": "improving/stable/deteriorating"
-        }},
-        "sales_efficiency": {{
+        },
+        "sales_efficiency": {
             "cac_payback_months": "X months",
             "magic_number": "Sales efficiency ratio if applicable"
-        }}
-    }},
-    "customer_value": {{
-        "ltv": {{
+        }
+    },
+    "customer_value": {
+        "ltv": {
             "value_usd": "Lifetime value in USD",
             "methodology": "How this was calculated",
             "ltv_cac_ratio": "X:1"
-        }},
+        },
         "arpu": "Average revenue per user/account"
-    }},
-    "retention_metrics": {{
+    },
+    "retention_metrics": {
         "gross_retention": "GRR percentage",
         "net_retention": "NRR percentage",
         "churn_rate": "Monthly/annual churn percentage",
         "expansion_revenue": "Percentage from upsells/cross-sells"
-    }},
-    "profitability": {{
+    },
+    "profitability": {
         "gross_margin": "X%",
         "contribution_margin": "X%",
         "unit_economics_assessment": "Assessment of overall unit economics health",
         "path_to_profitability": "Description of path to profitability"
-    }},
-    "benchmarks": {{
+    },
+    "benchmarks": {
         "industry_comparison": "How metrics compare to industry standards",
         "areas_of_strength": ["strength 1", "strength 2"],
         "areas_of_concern": ["concern 1", "concern 2"]
-    }},
+    },
     "sources": ["source 1", "source 2"]
-}}
+}
 
-Base your analysis on typical {sector} metrics. Provide reasonable estimates and clearly note assumptions."""
+Base your analysis on metrics typical for the target company's sector. Provide reasonable estimates and clearly note assumptions."""
 
-        try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+SYSTEM_BLOCKS = [{
+    "type": "text",
+    "text": SYSTEM_PROMPT,
+    "cache_control": {"type": "ephemeral"},
+}]
+
+
+# Forced tool call whose input_schema is the findings shape; reading
+# the tool input instead of parsing freeform text removes JSON-parse
+# failures entirely. Field details are described in SYSTEM_PROMPT, and
+# cache_control keeps the definition in the tools cache tier.
+SUBMIT_TOOL = {
+    "name": "submit_analysis",
+    "description": "Submit the completed unit economics findings",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "customer_acquisition": {"type": "object"},
+            "customer_value": {"type": "object"},
+            "retention_metrics": {"type": "object"},
+            "profitability": {"type": "object"},
+            "benchmarks": {"type": "object"},
+            "sources": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["customer_acquisition", "customer_value", "retention_metrics", "profitability", "benchmarks", "sources"]
+    },
+    "cache_control": {"type": "ephemeral"},
+}
+
+class UnitEconomicsSkill:
+    """
+    Claude skill for unit economics analysis.
+    Analyzes CAC, LTV, payback periods, retention, and profitability metrics.
+    """
+
+    MODEL = settings.skill_model_primary
+    FALLBACK_MODEL = settings.skill_model_fallback
+    SYSTEM = SYSTEM_BLOCKS
+    # Rough ceiling for the metrics findings JSON; kept small so the
+    # reservation doesn't inflate per-request latency
+    MAX_TOKENS = 2500
+    BATCH_SIZE = 5  # marshalled rows per prompt; latency grows super-linearly past this
+    MAX_BATCH_TOKENS = 8192
+    TOOLS = [SUBMIT_TOOL]
+    TOOL_CHOICE = {"type": "tool", "name": "submit_analysis"}
+    REQUIRED_KEYS = ("customer_acquisition", "customer_value", "retention_metrics")
+
+    def build_prompt(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> str:
+        """Build the deal-specific user message; the static schema lives in SYSTEM_BLOCKS"""
+        return f"""Company: {company_name}
+Sector: {sector}
+
+Key Questions:
+{filter_questions(key_questions, QUESTION_TERMS)}
 
-            content = response.content[0].text
-            result = json.loads(content)
+Additional Context:
+{context}"""
+
+    def parse_response(self, content: str) -> Dict:
+        """Parse the model's JSON response into the findings dict"""
+        return orjson.loads(content)
+
+    def error_result(self, error: str) -> Dict:
+        """Findings dict recording a failed execution"""
+        return {
+            "error": error,
+            "customer_acquisition": {},
+            "customer_value": {},
+            "retention_metrics": {},
+            "profitability": {},
+            "benchmarks": {},
+            "sources": []
+        }
+
+    def _try_model(self, model: str, prompt: str) -> Optional[Dict]:
+        """Call one model tier; None if it does not yield a usable findings dict"""
+        with anthropic_client.messages.stream(
+            model=model,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            tools=self.TOOLS,
+            tool_choice=self.TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            response = stream.get_final_message()
+        self._log_usage(model, response)
+        return self._tool_input(response)
+
+    def _log_usage(self, model: str, response) -> None:
+        """Record output length so MAX_TOKENS can be re-tuned from logs"""
+        logger.debug(
+            "%s %s output_tokens=%d", type(self).__name__, model,
+            response.usage.output_tokens
+        )
+
+    def _tool_input(self, response) -> Optional[Dict]:
+        """Extract the forced tool call's input as the findings dict"""
+        block = response.content[0]
+        result = block.input if block.type == "tool_use" else None
+        if not isinstance(result, dict) or not all(key in result for key in self.REQUIRED_KEYS):
+            return None
+        return result
+
+    async def _atry_model(self, model: str, prompt: str) -> Optional[Dict]:
+        """Async counterpart of _try_model on the shared AsyncAnthropic client"""
+        response = await stream_final_message(
+            model=model,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            tools=self.TOOLS,
+            tool_choice=self.TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        self._log_usage(model, response)
+        return self._tool_input(response)
+
+    def execute(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> Dict:
+        """
+        Execute unit economics workflow.
+
+        Returns dict with:
+        - customer_metrics: CAC, LTV, payback period
+        - retention_metrics: Churn, NRR, GRR
+        - profitability: Unit margins, contribution margins
+        - sources: Citations
+        """
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        try:
+            result = self._try_model(self.MODEL, prompt)
+            if result is None:
+                # Primary tier returned unusable JSON; escalate once
+                result = self._try_model(self.FALLBACK_MODEL, prompt)
+                logger.info(
+                    "%s escalated to %s", type(self).__name__, self.FALLBACK_MODEL
+                )
+            if result is None:
+                return self.error_result("Model returned malformed findings JSON")
+            return result
+        except Exception as e:
+            return self.error_result(str(e))
 
+    async def aexecute(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ) -> Dict:
+        """Async counterpart of execute so callers can fan out skills concurrently"""
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        try:
+            result = await self._atry_model(self.MODEL, prompt)
+            if result is None:
+                # Primary tier returned unusable JSON; escalate once
+                result = await self._atry_model(self.FALLBACK_MODEL, prompt)
+                logger.info(
+                    "%s escalated to %s", type(self).__name__, self.FALLBACK_MODEL
+                )
+            if result is None:
+                return self.error_result("Model returned malformed findings JSON")
             return result
         except Exception as e:
-            return {
-                "error": str(e),
-                "customer_acquisition": {},
-                "customer_value": {},
-                "retention_metrics": {},
-                "profitability": {},
-                "benchmarks": {},
-                "sources": []
-            }
+            return self.error_result(str(e))
+
+    async def astream(
+        self,
+        company_name: str,
+        sector: str,
+        key_questions: List[str],
+        context: str = ""
+    ):
+        """Yield response text deltas as they arrive, for interactive consumers"""
+        prompt = self.build_prompt(company_name, sector, key_questions, context)
+        async with get_client().messages.stream(
+            model=self.MODEL,
+            max_tokens=self.MAX_TOKENS,
+            system=SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for delta in stream.text_stream:
+                yield delta
+
+    def build_batch_prompt(self, companies: List[Dict]) -> str:
+        """User message packing several companies into one marshalled request"""
+        entries = [
+            f"Company {i}:\n" + self.build_prompt(**company)
+            for i, company in enumerate(companies, 1)
+        ]
+        return (
+            f"Analyze the following {len(companies)} companies. Return a JSON array "
+            f"of length {len(companies)} where element i is the JSON object described "
+            "in the schema for company i, in the same order.\n\n"
+            + "\n\n".join(entries)
+        )
+
+    async def aexecute_batch(self, companies: List[Dict]) -> List[Dict]:
+        """
+        Row-marshal several companies into shared prompts of up to
+        BATCH_SIZE rows each, amortizing the schema tokens across rows.
+        Each company dict takes the keyword arguments of build_prompt.
+        Returns one findings dict per company, in order.
+        """
+        results: List[Dict] = []
+        for start in range(0, len(companies), self.BATCH_SIZE):
+            results.extend(await self._aexecute_marshalled(companies[start:start + self.BATCH_SIZE]))
+        return results
+
+    async def _aexecute_marshalled(self, chunk: List[Dict]) -> List[Dict]:
+        """Run one marshalled prompt and split the array back into rows"""
+        try:
+            content = await stream_message_text(
+                model=self.MODEL,
+                max_tokens=min(self.MAX_TOKENS * len(chunk), self.MAX_BATCH_TOKENS),
+                system=SYSTEM_BLOCKS,
+                messages=[{"role": "user", "content": self.build_batch_prompt(chunk)}]
+            )
+            parsed = orjson.loads(content)
+            if not isinstance(parsed, list) or len(parsed) != len(chunk):
+                raise ValueError("Batched response is not an array matching the batch")
+        except Exception as e:
+            return [self.error_result(str(e)) for _ in chunk]
+        return [
+            item if isinstance(item, dict) else self.error_result("Malformed batch element")
+            for item in parsed
+        ]
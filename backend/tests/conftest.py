@@ -0,0 +1,208 @@
+import os
+
+from sqlalchemy.engine import make_url
+
+# Pick the test database before any insight_console import builds the
+# engines. Unless DATABASE_URL is set explicitly, tests run against a
+# shared-cache in-memory SQLite: DDL and commits hit RAM, and the sync
+# and async engines open the same database through the file: URI.
+# check_same_thread is off because TestClient drives requests from a
+# thread pool. Each pytest-xdist worker gets its own database so
+# parallel runs (`pytest -n auto --dist loadfile`) don't race; with an
+# explicit Postgres URL the per-worker databases must already exist.
+# The sentinel marks a URL this conftest chose itself: the xdist master
+# imports conftest too and exports the default URL, so workers must
+# rebuild it with their own database name rather than treat the
+# inherited value as user-supplied.
+_AUTOSET_SENTINEL = "_INSIGHT_TEST_DB_AUTOSET"
+_worker = os.environ.get("PYTEST_XDIST_WORKER")
+
+def _default_test_url(worker: str | None) -> str:
+    suffix = f"_{worker}" if worker else ""
+    return (
+        f"sqlite:///file:insight_test{suffix}"
+        "?mode=memory&cache=shared&uri=true&check_same_thread=false"
+    )
+
+if "DATABASE_URL" not in os.environ or os.environ.get(_AUTOSET_SENTINEL):
+    os.environ["DATABASE_URL"] = _default_test_url(_worker)
+    os.environ[_AUTOSET_SENTINEL] = "1"
+elif _worker:
+    # Suffix the database name, not the raw string, so query parameters
+    # like ?sslmode=require survive
+    _url = make_url(os.environ["DATABASE_URL"])
+    os.environ["DATABASE_URL"] = _url.set(
+        database=f"{_url.database}_{_worker}"
+    ).render_as_string(hide_password=False)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from insight_console.auth import create_access_token, pwd_context
+from insight_console.database import Base, SessionLocal, engine
+from insight_console.agents.scope_extractor import ScopeExtractor
+from insight_console.main import app
+from insight_console.models.deal import Deal
+from insight_console.models.user import User
+
+if engine.dialect.name == "sqlite":
+    # pysqlite implicitly commits around SAVEPOINT, which would break
+    # the rollback isolation in db_session. Take over transaction
+    # control per the SQLAlchemy pysqlite docs.
+    @event.listens_for(engine, "connect")
+    def _sqlite_disable_implicit_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _sqlite_emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def pytest_sessionstart(session):
+    """One-time test-process setup: cheap bcrypt, warm pool, schema"""
+    # Minimum bcrypt work factor for the test process only; production
+    # keeps the default cost
+    pwd_context.update(bcrypt__rounds=4)
+    # Warm the pool so the first test doesn't pay the cold connect
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    Base.metadata.create_all(bind=engine)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """
+    Transactional database session for a single test.
+
+    Each test runs inside an outer transaction that is rolled back on
+    exit, so in-test commit() calls only release savepoints and the
+    tables never need to be rebuilt between tests.
+
+    Do not combine this with committed_db_session (or fixtures built on
+    it) in one test: on in-memory SQLite both share a single underlying
+    connection, and the held-open transaction here would nest.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="function")
+def committed_db_session():
+    """
+    Session for tests whose fixture data must actually commit — API
+    tests, where the app reads through its own sessions and would not
+    see rows held inside a rolled-back transaction. Teardown deletes
+    every row instead of dropping and recreating the schema.
+    """
+    db = SessionLocal()
+    yield db
+    db.close()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture(scope="session")
+def _hashed_pw():
+    """
+    Placeholder digest for user fixtures. The API tests authenticate
+    with a pre-signed JWT and never log in with this password, so a
+    real bcrypt hash buys nothing here; test_auth.py still exercises
+    the actual hasher.
+    """
+    return "test$testpass123"
+
+
+@pytest.fixture(scope="session")
+def app_instance():
+    """The FastAPI app, imported once here in conftest; tests that need
+    it take this fixture instead of re-importing insight_console.main"""
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app_instance):
+    """One TestClient for the whole run; the context manager form runs
+    the app's lifespan startup and shutdown exactly once"""
+    with TestClient(app_instance) as c:
+        yield c
+
+
+# Fixed primary key for the shared API test user, outside anything the
+# sequence will hand out, so the session-scoped JWT below stays valid
+# across tests even though the row is recreated each time
+_TEST_USER_ID = 10_000
+
+
+@pytest.fixture
+def test_user(committed_db_session: Session, _hashed_pw: str):
+    """Committed user for API tests; recreated per test under a stable id"""
+    user = User(
+        id=_TEST_USER_ID,
+        email="investor@firm.com",
+        hashed_password=_hashed_pw,
+        full_name="Test Investor",
+        firm_id="firm-123",
+        role="investor"
+    )
+    committed_db_session.add(user)
+    committed_db_session.commit()
+    committed_db_session.refresh(user)
+    return user
+
+
+@pytest.fixture(scope="session")
+def _auth_token():
+    """Sign the API test user's JWT once; its claims never change"""
+    return create_access_token({"sub": "investor@firm.com", "user_id": _TEST_USER_ID})
+
+
+@pytest.fixture
+def auth_headers(test_user: User, _auth_token: str):
+    """Auth headers for the shared test user, reusing the cached token"""
+    return {"Authorization": f"Bearer {_auth_token}"}
+
+
+@pytest.fixture
+def auth_client(client: TestClient, auth_headers: dict):
+    """The shared client with the test user's auth header pre-applied,
+    so tests don't pass headers= on every call. The header is removed
+    on teardown because the client instance outlives the test."""
+    client.headers.update(auth_headers)
+    yield client
+    for key in auth_headers:
+        del client.headers[key]
+
+
+@pytest.fixture
+def test_deal(committed_db_session: Session, test_user: User):
+    """Committed deal owned by the shared test user"""
+    deal = Deal(
+        name="Test Deal",
+        target_company="Test Co",
+        sector="SaaS",
+        deal_type="buyout",
+        created_by_id=test_user.id,
+        firm_id=test_user.firm_id
+    )
+    committed_db_session.add(deal)
+    committed_db_session.commit()
+    committed_db_session.refresh(deal)
+    return deal
+
+
+@pytest.fixture(scope="session")
+def scope_extractor():
+    """One extractor for the session; it holds no per-call state, only
+    the shared Anthropic client"""
+    return ScopeExtractor()
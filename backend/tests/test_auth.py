@@ -1,9 +1,14 @@
+import time
+from datetime import timedelta
+
 import pytest
+from insight_console import auth
 from insight_console.auth import (
     hash_password,
     verify_password,
     create_access_token,
-    verify_token
+    verify_token,
+    verify_token_cached
 )
 
 def test_hash_password():
@@ -39,3 +44,12 @@ def test_verify_invalid_token():
     """Test that invalid tokens raise errors"""
     with pytest.raises(Exception):
         verify_token("invalid.token.here")
+
+def test_verify_token_cached_rejects_expired_entry():
+    """A cached payload past its exp claim must not authenticate"""
+    token = create_access_token({"sub": "x@y.z"}, expires_delta=timedelta(seconds=-1))
+    payload = {"sub": "x@y.z", "exp": int(time.time()) - 1}
+    with auth._token_cache_lock:
+        auth._token_cache[token] = (time.monotonic() + auth._TOKEN_CACHE_TTL, payload)
+    with pytest.raises(ValueError):
+        verify_token_cached(token)
@@ -2,33 +2,8 @@ import pytest
 from sqlalchemy.orm import Session
 from insight_console.models.deal import Deal, DealStatus
 from insight_console.models.user import User
-from insight_console.database import Base, engine, SessionLocal
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database session for each test"""
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    yield db
-    db.close()
-    Base.metadata.drop_all(bind=engine)
-
-@pytest.fixture
-def test_user(db_session: Session):
-    """Create a test user"""
-    user = User(
-        email="investor@firm.com",
-        hashed_password="hash123",
-        full_name="Test Investor",
-        firm_id="firm-123",
-        role="investor"
-    )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-    return user
-
-def test_create_deal(db_session: Session, test_user: User):
+def test_create_deal(committed_db_session: Session, test_user: User):
     """Test creating a deal"""
     deal = Deal(
         name="TechCo Acquisition",
@@ -39,9 +14,9 @@ def test_create_deal(db_session: Session, test_user: User):
         firm_id=test_user.firm_id,
         status=DealStatus.DRAFT
     )
-    db_session.add(deal)
-    db_session.commit()
-    db_session.refresh(deal)
+    committed_db_session.add(deal)
+    committed_db_session.commit()
+    committed_db_session.refresh(deal)
 
     assert deal.id is not None
     assert deal.name == "TechCo Acquisition"
@@ -1,89 +1,41 @@
 import pytest
-import io
 from fastapi.testclient import TestClient
+import io
 from sqlalchemy.orm import Session
-from insight_console.main import app
 from insight_console.models.user import User
 from insight_console.models.deal import Deal
-from insight_console.database import Base, engine, SessionLocal
-from insight_console.auth import hash_password, create_access_token
-
-client = TestClient(app)
-
-@pytest.fixture(scope="function")
-def db_session():
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    yield db
-    db.close()
-    Base.metadata.drop_all(bind=engine)
-
-@pytest.fixture
-def test_user(db_session: Session):
-    user = User(
-        email="investor@firm.com",
-        hashed_password=hash_password("testpass123"),
-        full_name="Test Investor",
-        firm_id="firm-123",
-        role="investor"
-    )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-    return user
-
-@pytest.fixture
-def test_deal(db_session: Session, test_user: User):
-    deal = Deal(
-        name="Test Deal",
-        target_company="Test Co",
-        sector="SaaS",
-        deal_type="buyout",
-        created_by_id=test_user.id,
-        firm_id=test_user.firm_id
-    )
-    db_session.add(deal)
-    db_session.commit()
-    db_session.refresh(deal)
-    return deal
+from insight_console.models.document import Document
 
-@pytest.fixture
-def auth_headers(test_user: User):
-    token = create_access_token({"sub": test_user.email, "user_id": test_user.id})
-    return {"Authorization": f"Bearer {token}"}
-
-def test_upload_document(db_session: Session, test_deal: Deal, auth_headers: dict):
+def test_upload_document(committed_db_session: Session, test_deal: Deal, auth_client: TestClient):
     """Test uploading a document to a deal"""
     file_content = b"This is a test PDF content"
     files = {
         "file": ("test_memo.pdf", io.BytesIO(file_content), "application/pdf")
     }
-    response = client.post(
+    response = auth_client.post(
         f"/api/deals/{test_deal.id}/documents",
-        files=files,
-        headers=auth_headers
-    )
+        files=files)
     assert response.status_code == 201
     data = response.json()
     assert data["filename"] == "test_memo.pdf"
     assert data["deal_id"] == test_deal.id
 
-def test_list_documents(db_session: Session, test_deal: Deal, auth_headers: dict):
+def test_list_documents(committed_db_session: Session, test_deal: Deal, auth_client: TestClient):
     """Test listing documents for a deal"""
-    # Upload a document first
-    files = {
-        "file": ("memo.pdf", io.BytesIO(b"content"), "application/pdf")
-    }
-    client.post(
-        f"/api/deals/{test_deal.id}/documents",
-        files=files,
-        headers=auth_headers
+    # Seed directly; the upload path has its own test above
+    document = Document(
+        deal_id=test_deal.id,
+        filename="memo.pdf",
+        file_path="uploads/memo.pdf",
+        file_size=7,
+        mime_type="application/pdf",
+        uploaded_by_id=test_deal.created_by_id
     )
+    committed_db_session.add(document)
+    committed_db_session.commit()
 
-    response = client.get(
-        f"/api/deals/{test_deal.id}/documents",
-        headers=auth_headers
-    )
+    response = auth_client.get(
+        f"/api/deals/{test_deal.id}/documents")
     assert response.status_code == 200
     data = response.json()
     assert len(data) >= 1
@@ -1,10 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
-from insight_console.main import app
 
-client = TestClient(app)
-
-def test_health_check():
+def test_health_check(client: TestClient):
     """Test health check endpoint returns healthy status"""
     response = client.get("/health")
     assert response.status_code == 200
@@ -1,11 +1,8 @@
 import pytest
 from insight_console.agents.scope_extractor import ScopeExtractor
 
-@pytest.fixture
-def scope_extractor():
-    return ScopeExtractor()
-
-def test_extract_scope_from_text(scope_extractor: ScopeExtractor):
+@pytest.mark.integration
+async def test_extract_scope_from_text(scope_extractor: ScopeExtractor):
     """Test extracting scope from investment memo text"""
     memo_text = """
     Investment Memo: TechCo Acquisition
@@ -22,7 +19,7 @@ def test_extract_scope_from_text(scope_extractor: ScopeExtractor):
     - CAC payback will improve with sales efficiency
     """
 
-    result = scope_extractor.extract_scope(memo_text, sector="B2B SaaS", deal_type="buyout")
+    result = await scope_extractor.extract_scope(memo_text, sector="B2B SaaS", deal_type="buyout")
 
     assert "key_questions" in result
     assert len(result["key_questions"]) >= 2
@@ -30,9 +27,9 @@ def test_extract_scope_from_text(scope_extractor: ScopeExtractor):
     assert len(result["hypotheses"]) >= 1
     assert "recommended_workflows" in result
 
-def test_extract_scope_handles_empty_text(scope_extractor: ScopeExtractor):
+async def test_extract_scope_handles_empty_text(scope_extractor: ScopeExtractor):
     """Test that scope extraction handles empty or minimal text"""
-    result = scope_extractor.extract_scope("", sector="Healthcare", deal_type="growth")
+    result = await scope_extractor.extract_scope("", sector="Healthcare", deal_type="growth")
 
     # Should still return structure with defaults
     assert "key_questions" in result
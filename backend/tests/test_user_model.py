@@ -1,16 +1,6 @@
 import pytest
 from sqlalchemy.orm import Session
 from insight_console.models.user import User
-from insight_console.database import Base, engine, SessionLocal
-
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database session for each test"""
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    yield db
-    db.close()
-    Base.metadata.drop_all(bind=engine)
 
 def test_create_user(db_session: Session):
     """Test creating a user in the database"""